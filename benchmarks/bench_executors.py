@@ -0,0 +1,71 @@
+"""Compare serial, thread and process execution of evaluate_document_pairs.
+
+Run with a regular and a free-threaded interpreter (e.g. ``python3.13t``) to see
+how thread pools scale with and without the GIL:
+
+    python benchmarks/bench_executors.py --documents 16 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.evaluator import EXECUTORS, evaluate_document_pairs  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+PARAGRAPH = "The quick brown fox jumps over the lazy dog while the band plays on. " * 8
+
+
+def _make_pair(tmp: Path, idx: int, tables: int, rows: int) -> tuple[Path, Path]:
+    gt = new_doc()
+    ev = new_doc()
+    for t in range(tables):
+        t1 = add_table(gt, rows, 2)
+        t2 = add_table(ev, rows, 2)
+        for r in range(rows):
+            n = t * rows + r
+            set_cell_text(t1.cell(r, 0), f"{PARAGRAPH}CELL_{n} {PARAGRAPH}")
+            set_cell_text(t2.cell(r, 0), f"{PARAGRAPH[5:]}CELL_{n} {PARAGRAPH}x")
+            set_cell_text(t1.cell(r, 1), f"CELL_{n + 1000} {PARAGRAPH}")
+            set_cell_text(t2.cell(r, 1), f"{PARAGRAPH} CELL_{n + 1000}")
+    p_gt, p_ev = tmp / f"b{idx}_gt.docx", tmp / f"b{idx}_ev.docx"
+    save(gt, p_gt)
+    save(ev, p_ev)
+    return p_gt, p_ev
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]} gil={'on' if gil else 'off'} workers={args.workers}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pairs = [_make_pair(Path(tmp), i, args.tables, args.rows) for i in range(args.documents)]
+        baseline = None
+        for executor in EXECUTORS:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = evaluate_document_pairs(pairs, executor=executor, max_workers=args.workers)
+                best = min(best, time.perf_counter() - start)
+            if baseline is None:
+                baseline = results
+            assert results == baseline, f"{executor} results differ from serial"
+            print(f"{executor:>10}: {best:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Time evaluate_documents with and without the token prefilter on sparse documents.
+
+Builds a GT/eval pair where only ``--token-share`` of the cells carry a token
+(default 3%), the common case of headers, numbers and boilerplate:
+
+    python benchmarks/bench_prefilter.py --tables 10 --rows 40 --cols 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.evaluator import evaluate_documents  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _make_pair(tmp: Path, tables: int, rows: int, cols: int, token_share: float) -> tuple[Path, Path]:
+    rng = random.Random(0)
+    gt = new_doc()
+    ev = new_doc()
+    n = 0
+    for _ in range(tables):
+        t_gt = add_table(gt, rows, cols)
+        t_ev = add_table(ev, rows, cols)
+        for r in range(rows):
+            for c in range(cols):
+                text = f"Item {r}-{c} amount {rng.randint(0, 99999)} EUR"
+                if rng.random() < token_share:
+                    n += 1
+                    set_cell_text(t_gt.cell(r, c), f"{text} CELL_{n}")
+                    set_cell_text(t_ev.cell(r, c), f"CELL_{n} {text}")
+                else:
+                    set_cell_text(t_gt.cell(r, c), text)
+                    set_cell_text(t_ev.cell(r, c), text)
+    save(gt, tmp / "gt.docx")
+    save(ev, tmp / "ev.docx")
+    return tmp / "gt.docx", tmp / "ev.docx"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--token-share", type=float, default=0.03)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gt, ev = _make_pair(Path(tmp), args.tables, args.rows, args.cols, args.token_share)
+        results = {}
+        for prefilter in (False, True):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[prefilter] = evaluate_documents(gt, ev, prefilter=prefilter)
+                best = min(best, time.perf_counter() - start)
+            print(f"prefilter={'on ' if prefilter else 'off'}  {best:.3f}s")
+        skipped = results[True].pop("skipped_cells")
+        assert results[True] == results[False], "prefilter changed the totals"
+        print(f"cells: {args.tables * args.rows * args.cols}, skipped: {skipped}, totals identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Token scan cost versus number of active token families.
+
+Compares the combined single-pass scanner (TokenGrammar) against running one
+regex per family over the same cell texts and merging the matches by position:
+
+    python benchmarks/bench_token_scan.py --cells 20000 --max-families 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.docx_utils import TokenGrammar  # noqa: E402
+
+FAMILIES = [
+    ("cell", r"(?i)cell_\d+"),
+    ("field", r"\{\{\w+\}\}"),
+    ("ref", r"\[\[ref:\d+\]\]"),
+    ("anchor", r"<<[A-Z_]+>>"),
+    ("sig", r"\$SIG_\d+\$"),
+    ("date", r"@date\(\w+\)"),
+    ("note", r"%%note\d+%%"),
+    ("tag", r"#tag-[a-z]+#"),
+]
+PARAGRAPH = "The quick brown fox jumps over the lazy dog while the band plays on. "
+
+
+def _cells(n: int) -> list[str]:
+    samples = ["CELL_1", "{{name}}", "[[ref:4]]", "<<TOTAL>>", "$SIG_2$", "@date(due)", "%%note1%%", "#tag-x#"]
+    return [f"{PARAGRAPH}{samples[i % len(samples)]} {PARAGRAPH}" for i in range(n)]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=20000)
+    parser.add_argument("--max-families", type=int, default=len(FAMILIES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = _cells(args.cells)
+    print(f"{'families':>8}  {'combined s':>10}  {'separate s':>10}  {'ratio':>6}")
+    for k in range(1, min(args.max_families, len(FAMILIES)) + 1):
+        active = dict(FAMILIES[:k])
+        grammar = TokenGrammar(active)
+        separate = [(name, re.compile(p)) for name, p in active.items()]
+        combined_s = _best(lambda: [list(grammar.scan(t)) for t in texts], args.repeat)
+        separate_s = _best(
+            lambda: [
+                sorted((m.start(), m.end(), name, m.group(0)) for name, r in separate for m in r.finditer(t))
+                for t in texts
+            ],
+            args.repeat,
+        )
+        print(f"{k:>8}  {combined_s:>10.4f}  {separate_s:>10.4f}  {separate_s / combined_s:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
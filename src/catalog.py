@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .docx_utils import CellText, TokenGrammar, extract_table_cell_texts, strip_tokens
+from .hashing import content_hash
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_MASK_63 = (1 << 63) - 1
+_SHINGLE_WORDS = 3
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _permutations() -> list[tuple[int, int]]:
+    # Fixed (a, b) pairs for h(x) = (a * x + b) mod p; derived from a hash so every
+    # catalog built by any version of this module agrees on them
+    perms = []
+    for i in range(NUM_PERM):
+        a = _hash64(f"minhash-a-{i}".encode()) % (_PRIME - 1) + 1
+        b = _hash64(f"minhash-b-{i}".encode()) % _PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMS = _permutations()
+
+
+@dataclass
+class CatalogMatch:
+    path: Path
+    score: float  # estimated Jaccard similarity of document features
+
+
+def document_features(cells: list[CellText], grammar: TokenGrammar | None = None) -> set[str]:
+    """Token-free word shingles of every cell plus table shape markers."""
+    features: set[str] = set()
+    shapes: dict[int, tuple[int, int]] = {}
+    for cell in cells:
+        rows, cols = shapes.get(cell.table_index, (0, 0))
+        shapes[cell.table_index] = (max(rows, cell.merged_rect[2] + 1), max(cols, cell.merged_rect[3] + 1))
+        base, _ = strip_tokens(cell.text, grammar)
+        words = base.lower().split()
+        if not words:
+            continue
+        if len(words) < _SHINGLE_WORDS:
+            features.add("w:" + " ".join(words))
+            continue
+        for i in range(len(words) - _SHINGLE_WORDS + 1):
+            features.add("w:" + " ".join(words[i : i + _SHINGLE_WORDS]))
+    for t_idx, (rows, cols) in shapes.items():
+        features.add(f"shape:{t_idx}:{rows}x{cols}")
+    features.add(f"tables:{len(shapes)}")
+    return features
+
+
+def minhash_signature(features: Iterable[str]) -> list[int]:
+    hashed = [_hash64(f.encode("utf-8")) for f in features]
+    if not hashed:
+        return [_PRIME] * NUM_PERM
+    return [min((a * x + b) % _PRIME for x in hashed) for a, b in _PERMS]
+
+
+def _band_buckets(signature: list[int]) -> list[tuple[int, int]]:
+    buckets = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        # Fit SQLite's signed 64-bit INTEGER
+        buckets.append((band, _hash64(array("Q", chunk).tobytes()) & _MASK_63))
+    return buckets
+
+
+def _similarity(a: list[int], b: list[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+class GroundTruthCatalog:
+    """SQLite-backed MinHash/LSH index of GT documents.
+
+    Lookups only touch documents that share at least one LSH band with the query,
+    so resolving an eval document does not scale with the catalog size. Features
+    are computed with ``grammar`` removed, so a catalog should be built and queried
+    with the same token grammar.
+    """
+
+    def __init__(self, path: Path, grammar: TokenGrammar | None = None) -> None:
+        self.path = path
+        self.grammar = grammar
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                content_hash TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lsh (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS lsh_bucket ON lsh (band, bucket);
+            CREATE INDEX IF NOT EXISTS lsh_doc ON lsh (doc_id);
+            """
+        )
+
+    def __enter__(self) -> GroundTruthCatalog:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, gt_path: Path) -> bool:
+        """Index (or re-index) one GT file; returns False if it is already up to date."""
+        key = str(gt_path.resolve())
+        digest = content_hash(gt_path)
+        row = self._conn.execute("SELECT id, content_hash FROM documents WHERE path = ?", (key,)).fetchone()
+        if row is not None and row[1] == digest:
+            return False
+        signature = minhash_signature(document_features(extract_table_cell_texts(gt_path), self.grammar))
+        with self._conn:
+            if row is not None:
+                self._delete(row[0])
+            cur = self._conn.execute(
+                "INSERT INTO documents (path, content_hash, signature) VALUES (?, ?, ?)",
+                (key, digest, array("Q", signature).tobytes()),
+            )
+            doc_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO lsh (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in _band_buckets(signature)],
+            )
+        return True
+
+    def add_many(self, gt_paths: Iterable[Path]) -> int:
+        return sum(1 for p in gt_paths if self.add(p))
+
+    def _delete(self, doc_id: int) -> None:
+        self._conn.execute("DELETE FROM lsh WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def prune(self) -> int:
+        """Drop entries whose GT file no longer exists."""
+        stale = [(i,) for i, p in self._conn.execute("SELECT id, path FROM documents") if not Path(p).exists()]
+        with self._conn:
+            self._conn.executemany("DELETE FROM lsh WHERE doc_id = ?", stale)
+            self._conn.executemany("DELETE FROM documents WHERE id = ?", stale)
+        return len(stale)
+
+    def find_cells(self, cells: list[CellText], top_k: int = 5) -> list[CatalogMatch]:
+        signature = minhash_signature(document_features(cells, self.grammar))
+        candidates: set[int] = set()
+        for band, bucket in _band_buckets(signature):
+            candidates.update(
+                r[0] for r in self._conn.execute("SELECT doc_id FROM lsh WHERE band = ? AND bucket = ?", (band, bucket))
+            )
+        matches: list[CatalogMatch] = []
+        for doc_id in candidates:
+            path, blob = self._conn.execute("SELECT path, signature FROM documents WHERE id = ?", (doc_id,)).fetchone()
+            matches.append(CatalogMatch(path=Path(path), score=_similarity(signature, list(array("Q", blob)))))
+        matches.sort(key=lambda m: (-m.score, str(m.path)))
+        return matches[:top_k]
+
+    def find(self, eval_path: Path, top_k: int = 5) -> list[CatalogMatch]:
+        return self.find_cells(extract_table_cell_texts(eval_path), top_k=top_k)
+
+    def best_match(self, eval_path: Path, min_score: float = 0.0) -> CatalogMatch | None:
+        matches = self.find(eval_path, top_k=1)
+        if not matches or matches[0].score < min_score:
+            return None
+        return matches[0]
@@ -3,15 +3,16 @@ import json
 import sys
 from pathlib import Path
 
-from .evaluator import evaluate_documents
+from .evaluator import EXECUTORS, MATCH_MODES, EvaluationBudget, evaluate_documents
 from .report import format_report
 
 
-def _validate_paths(gt_path: Path, eval_path: Path, out_path: Path) -> None:
-    if not gt_path.exists() or gt_path.suffix.lower() != ".docx":
-        raise SystemExit(f"Invalid --gt path: {gt_path}")
-    if not eval_path.exists() or eval_path.suffix.lower() != ".docx":
-        raise SystemExit(f"Invalid --eval path: {eval_path}")
+def _check_docx(path: Path, flag: str) -> None:
+    if not path.exists() or path.suffix.lower() != ".docx":
+        raise SystemExit(f"Invalid {flag} path: {path}")
+
+
+def _validate_out(out_path: Path) -> None:
     if out_path.suffix.lower() not in {".json", ".csv", ".md"}:
         raise SystemExit(f"Invalid --out extension: {out_path.suffix}")
     out_dir = out_path.parent
@@ -24,13 +25,79 @@ def _validate_paths(gt_path: Path, eval_path: Path, out_path: Path) -> None:
         raise SystemExit(f"Cannot write to --out path: {out_path} ({exc})") from exc
 
 
+def _validate_paths(gt_path: Path, eval_path: Path, out_path: Path) -> None:
+    _check_docx(gt_path, "--gt")
+    _check_docx(eval_path, "--eval")
+    _validate_out(out_path)
+
+
+def _add_budget_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--max-cell-work",
+        type=int,
+        default=0,
+        help=(
+            "Cells whose GT x eval text length product exceeds this (e.g. 50000000) use a "
+            "cheaper fallback mapping and are flagged as degraded (default: 0, every cell is mapped exactly)"
+        ),
+    )
+    parser.add_argument(
+        "--max-document-seconds",
+        type=float,
+        default=None,
+        help="Wall-time budget per document; later cells use the fallback mapping",
+    )
+
+
+def _add_grammar_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--token-pattern",
+        action="append",
+        default=None,
+        metavar="NAME=REGEX",
+        help=(
+            "Token family to evaluate (repeatable); all families are matched in one pass "
+            "and reported separately (default: the built-in cell_N family)"
+        ),
+    )
+
+
+def _make_grammar(args: argparse.Namespace):
+    if not args.token_pattern:
+        return None
+    from .docx_utils import TokenGrammar
+
+    try:
+        return TokenGrammar.from_specs(args.token_pattern)
+    except ValueError as exc:
+        raise SystemExit(f"Invalid --token-pattern: {exc}") from exc
+
+
+def _make_budget(args: argparse.Namespace) -> EvaluationBudget | None:
+    max_cell_work = args.max_cell_work if args.max_cell_work > 0 else None
+    if max_cell_work is None and args.max_document_seconds is None:
+        return None
+    return EvaluationBudget(max_cell_work=max_cell_work, max_document_seconds=args.max_document_seconds)
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="docx-markup-eval",
         description="Evaluate DOCX markup placement within tables",
     )
-    parser.add_argument("--gt", required=True, help="Path to ground-truth .docx")
+    gt_source = parser.add_mutually_exclusive_group(required=True)
+    gt_source.add_argument("--gt", help="Path to ground-truth .docx")
+    gt_source.add_argument(
+        "--gt-catalog",
+        help="GT catalog (see 'catalog' command) used to find the ground truth for --eval",
+    )
     parser.add_argument("--eval", required=True, help="Path to evaluated .docx")
+    parser.add_argument(
+        "--min-match-score",
+        type=float,
+        default=0.5,
+        help="Minimum estimated similarity for a --gt-catalog match (default: 0.5)",
+    )
     parser.add_argument(
         "--format",
         required=True,
@@ -39,19 +106,441 @@ def build_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument("--out", required=True, help="Output file path")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    _add_mapping_cache_arguments(parser)
+    parser.add_argument(
+        "--executor",
+        default="serial",
+        choices=list(EXECUTORS),
+        help="Evaluate tables serially or on a thread/process pool (default: serial)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Pool size for --executor (default: CPU count)")
+    parser.add_argument(
+        "--match",
+        default="position",
+        choices=list(MATCH_MODES),
+        help="position: any token at the right place counts; identity: token ids must match too (default: position)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        default=None,
+        help=(
+            "Stream both documents one table at a time to bound memory, and report peak memory "
+            "per stage against this size (e.g. 512M, 2G). The size is only checked after the run "
+            "(a warning is printed if it was exceeded), never enforced. Runs serially; cannot be "
+            "combined with --executor/--workers"
+        ),
+    )
+    parser.add_argument(
+        "--prefilter",
+        action="store_true",
+        help=(
+            "Skip cells without tokens in either document before building their text; "
+            "totals are unchanged (ignored with --debug, --record-run and --max-memory)"
+        ),
+    )
+    parser.add_argument(
+        "--record-run",
+        default=None,
+        metavar="NAME",
+        help="Record per-document and per-cell results under this run name in --run-store",
+    )
+    parser.add_argument("--run-store", default="runs.db", help="Run history database (default: runs.db)")
+    _add_budget_arguments(parser)
+    _add_grammar_arguments(parser)
     return parser
 
 
+def _add_mapping_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--mapping-cache-bytes",
+        type=int,
+        default=32 * 1024 * 1024,
+        help="Memory budget for memoized position mappings; 0 disables (default: 32 MiB)",
+    )
+    parser.add_argument(
+        "--mapping-cache",
+        default=None,
+        help="File to load/save memoized position mappings so they are shared between runs",
+    )
+
+
+def _make_mapping_cache(args: argparse.Namespace):
+    from .mapping_cache import MappingCache
+
+    if args.mapping_cache_bytes <= 0:
+        return None
+    path = Path(args.mapping_cache) if args.mapping_cache else None
+    return MappingCache(max_bytes=args.mapping_cache_bytes, path=path)
+
+
+def build_watch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docx-markup-eval watch",
+        description="Re-score eval documents as they appear or change in a directory",
+    )
+    parser.add_argument("--gt-dir", required=True, help="Directory with ground-truth .docx files")
+    parser.add_argument("--eval-dir", required=True, help="Directory receiving evaluated .docx files")
+    parser.add_argument("--out-dir", required=True, help="Directory for per-document and aggregate reports")
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=["json", "csv", "md"],
+        help="Report format (default: json)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    parser.add_argument(
+        "--executor",
+        default="processes",
+        choices=["threads", "processes"],
+        help="Pool type; threads suit free-threaded Python builds (default: processes)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Seconds a file must stay unchanged before it is scored (default: 2.0)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between stat scans when polling (default: 1.0)",
+    )
+    parser.add_argument("--no-inotify", action="store_true", help="Always use stat polling")
+    _add_budget_arguments(parser)
+    _add_grammar_arguments(parser)
+    return parser
+
+
+def _watch_main(argv: list[str]) -> None:
+    from .watch import EvalDirectoryWatcher
+
+    args = build_watch_parser().parse_args(argv)
+    gt_dir = Path(args.gt_dir)
+    eval_dir = Path(args.eval_dir)
+    for flag, directory in (("--gt-dir", gt_dir), ("--eval-dir", eval_dir)):
+        if not directory.is_dir():
+            raise SystemExit(f"Invalid {flag} path: {directory}")
+    watcher = EvalDirectoryWatcher(
+        gt_dir=gt_dir,
+        eval_dir=eval_dir,
+        out_dir=Path(args.out_dir),
+        fmt=args.format,
+        workers=args.workers,
+        executor=args.executor,
+        budget=_make_budget(args),
+        settle_seconds=args.settle,
+        poll_interval=args.poll_interval,
+        use_inotify=not args.no_inotify,
+        grammar=_make_grammar(args),
+    )
+    watcher.run()
+
+
+def build_estimate_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docx-markup-eval estimate",
+        description="Estimate placement rates over a corpus from a reproducible sample",
+    )
+    parser.add_argument("--gt-dir", required=True, help="Directory with ground-truth .docx files")
+    parser.add_argument("--eval-dir", required=True, help="Directory with evaluated .docx files")
+    parser.add_argument(
+        "--format",
+        required=True,
+        choices=["json", "csv", "md"],
+        help="Output format",
+    )
+    parser.add_argument("--out", required=True, help="Output file path")
+    parser.add_argument(
+        "--precision",
+        type=float,
+        default=0.01,
+        help="Stop once every rate is known within +/- this value (default: 0.01)",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level (default: 0.95)")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed (default: 0)")
+    parser.add_argument(
+        "--cell-fraction",
+        type=float,
+        default=0.25,
+        help="Share of token-bearing cells evaluated per stratum (default: 0.25)",
+    )
+    parser.add_argument(
+        "--min-documents",
+        type=int,
+        default=5,
+        help="Documents to sample before early stopping is considered (default: 5)",
+    )
+    parser.add_argument("--max-documents", type=int, default=None, help="Upper bound on sampled documents")
+    _add_budget_arguments(parser)
+    _add_grammar_arguments(parser)
+    return parser
+
+
+def _estimate_main(argv: list[str]) -> None:
+    from .pairing import pair_directories
+    from .report import format_estimate_report
+    from .sampling import estimate_corpus
+
+    args = build_estimate_parser().parse_args(argv)
+    gt_dir = Path(args.gt_dir)
+    eval_dir = Path(args.eval_dir)
+    for flag, directory in (("--gt-dir", gt_dir), ("--eval-dir", eval_dir)):
+        if not directory.is_dir():
+            raise SystemExit(f"Invalid {flag} path: {directory}")
+    out_path = Path(args.out)
+    if out_path.suffix.lower() not in {".json", ".csv", ".md"}:
+        raise SystemExit(f"Invalid --out extension: {out_path.suffix}")
+    pairs = pair_directories(gt_dir, eval_dir)
+    if not pairs:
+        raise SystemExit(f"No eval documents in {eval_dir} could be paired with a GT in {gt_dir}")
+
+    try:
+        result = estimate_corpus(
+            pairs,
+            precision=args.precision,
+            confidence=args.confidence,
+            seed=args.seed,
+            cell_fraction=args.cell_fraction,
+            min_documents=args.min_documents,
+            max_documents=args.max_documents,
+            budget=_make_budget(args),
+            grammar=_make_grammar(args),
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(format_estimate_report(result, args.format), encoding="utf-8")
+
+
+def build_catalog_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docx-markup-eval catalog",
+        description="Add ground-truth documents to a MinHash/LSH catalog for --gt-catalog lookups",
+    )
+    parser.add_argument("--catalog", required=True, help="Catalog database file (created if missing)")
+    parser.add_argument("paths", nargs="*", help="GT .docx files or directories to (re)index")
+    parser.add_argument("--prune", action="store_true", help="Drop entries whose GT file no longer exists")
+    _add_grammar_arguments(parser)
+    return parser
+
+
+def _catalog_main(argv: list[str]) -> None:
+    from .catalog import GroundTruthCatalog
+    from .pairing import list_docx
+
+    args = build_catalog_parser().parse_args(argv)
+    gt_paths: list[Path] = []
+    for raw in args.paths:
+        path = Path(raw)
+        if path.is_dir():
+            gt_paths.extend(list_docx(path))
+        elif path.exists() and path.suffix.lower() == ".docx":
+            gt_paths.append(path)
+        else:
+            raise SystemExit(f"Invalid GT path: {path}")
+
+    with GroundTruthCatalog(Path(args.catalog), grammar=_make_grammar(args)) as catalog:
+        indexed = catalog.add_many(gt_paths)
+        pruned = catalog.prune() if args.prune else 0
+        print(f"indexed {indexed}, pruned {pruned}, total {len(catalog)}")
+
+
+def build_compare_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docx-markup-eval compare",
+        description="Rank several candidate documents against one ground truth",
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth .docx")
+    parser.add_argument("--eval", required=True, nargs="+", help="Candidate .docx files")
+    parser.add_argument(
+        "--format",
+        required=True,
+        choices=["json", "csv", "md"],
+        help="Output format",
+    )
+    parser.add_argument("--out", required=True, help="Output file path")
+    _add_mapping_cache_arguments(parser)
+    parser.add_argument(
+        "--executor",
+        default="serial",
+        choices=list(EXECUTORS),
+        help="Score candidates serially or on a thread/process pool (default: serial)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Pool size for --executor (default: CPU count)")
+    parser.add_argument(
+        "--match",
+        default="position",
+        choices=list(MATCH_MODES),
+        help="position: any token at the right place counts; identity: token ids must match too (default: position)",
+    )
+    _add_budget_arguments(parser)
+    _add_grammar_arguments(parser)
+    return parser
+
+
+def _compare_main(argv: list[str]) -> None:
+    from .compare import compare_documents
+
+    args = build_compare_parser().parse_args(argv)
+    gt_path = Path(args.gt)
+    eval_paths = [Path(p) for p in args.eval]
+    out_path = Path(args.out)
+    _check_docx(gt_path, "--gt")
+    for eval_path in eval_paths:
+        _check_docx(eval_path, "--eval")
+    _validate_out(out_path)
+
+    mapping_cache = _make_mapping_cache(args)
+    result = compare_documents(
+        gt_path,
+        eval_paths,
+        mapping_cache=mapping_cache,
+        executor=args.executor,
+        max_workers=args.workers,
+        budget=_make_budget(args),
+        match=args.match,
+        grammar=_make_grammar(args),
+    )
+    if mapping_cache is not None:
+        mapping_cache.save()
+    result["gt_path"] = str(gt_path)
+    out_path.write_text(format_report(result, args.format), encoding="utf-8")
+
+
+def build_diff_runs_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docx-markup-eval diff-runs",
+        description="List cells that regressed or improved between two recorded runs",
+    )
+    parser.add_argument("base", help="Name of the earlier run")
+    parser.add_argument("new", help="Name of the later run")
+    parser.add_argument("--run-store", default="runs.db", help="Run history database (default: runs.db)")
+    parser.add_argument(
+        "--format",
+        default="md",
+        choices=["json", "csv", "md"],
+        help="Output format (default: md)",
+    )
+    parser.add_argument("--out", default=None, help="Output file path (default: stdout)")
+    return parser
+
+
+def _diff_runs_main(argv: list[str]) -> None:
+    from .report import format_run_diff
+    from .run_store import RunStore
+
+    args = build_diff_runs_parser().parse_args(argv)
+    store_path = Path(args.run_store)
+    if not store_path.exists():
+        raise SystemExit(f"Invalid --run-store path: {store_path}")
+    with RunStore(store_path) as store:
+        try:
+            diff = store.diff(args.base, args.new)
+        except KeyError as exc:
+            raise SystemExit(f"Unknown run {exc.args[0]!r}; recorded runs: {', '.join(store.runs()) or 'none'}") from exc
+    text = format_run_diff(diff, args.format)
+    if args.out is None:
+        sys.stdout.write(text)
+        return
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(text, encoding="utf-8")
+
+
+def _resolve_gt(args: argparse.Namespace, eval_path: Path) -> tuple[Path, dict]:
+    if args.gt:
+        return Path(args.gt), {}
+    from .catalog import GroundTruthCatalog
+
+    catalog_path = Path(args.gt_catalog)
+    if not catalog_path.exists():
+        raise SystemExit(f"Invalid --gt-catalog path: {catalog_path}")
+    if not eval_path.exists() or eval_path.suffix.lower() != ".docx":
+        raise SystemExit(f"Invalid --eval path: {eval_path}")
+    with GroundTruthCatalog(catalog_path, grammar=_make_grammar(args)) as catalog:
+        match = catalog.best_match(eval_path, min_score=args.min_match_score)
+    if match is None:
+        raise SystemExit(f"No GT in {catalog_path} matches {eval_path} (min score {args.min_match_score})")
+    return match.path, {"gt_path": str(match.path), "gt_match_score": match.score}
+
+
+_COMMANDS = {
+    "watch": _watch_main,
+    "estimate": _estimate_main,
+    "catalog": _catalog_main,
+    "compare": _compare_main,
+    "diff-runs": _diff_runs_main,
+}
+
+
 def main(argv: list[str] | None = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _COMMANDS:
+        _COMMANDS[argv[0]](argv[1:])
+        return
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    gt_path = Path(args.gt)
     eval_path = Path(args.eval)
     out_path = Path(args.out)
+    gt_path, resolution = _resolve_gt(args, eval_path)
     _validate_paths(gt_path, eval_path, out_path)
 
-    result = evaluate_documents(gt_path, eval_path, debug=args.debug)
+    mapping_cache = _make_mapping_cache(args)
+    grammar = _make_grammar(args)
+    # Recording a run needs the per-cell results that debug mode collects
+    collect_cells = args.debug or args.record_run is not None
+    if args.max_memory is not None:
+        from .evaluator import evaluate_documents_streaming
+        from .memory import parse_size
+
+        try:
+            memory_limit = parse_size(args.max_memory)
+        except ValueError as exc:
+            raise SystemExit(f"Invalid --max-memory: {exc}") from exc
+        if args.executor != "serial" or args.workers is not None:
+            raise SystemExit("--max-memory streams tables serially and cannot be combined with --executor/--workers")
+        result = evaluate_documents_streaming(
+            gt_path,
+            eval_path,
+            debug=collect_cells,
+            mapping_cache=mapping_cache,
+            budget=_make_budget(args),
+            match=args.match,
+            memory_limit=memory_limit,
+            grammar=grammar,
+        )
+        memory = result["memory"]
+        if not memory["within_limit"]:
+            peak = max(memory["peak_rss_bytes"], memory["max_rss_bytes"] or 0)
+            print(f"warning: peak RSS {peak} bytes exceeded --max-memory {memory_limit}", file=sys.stderr)
+    else:
+        result = evaluate_documents(
+            gt_path,
+            eval_path,
+            debug=collect_cells,
+            mapping_cache=mapping_cache,
+            executor=args.executor,
+            max_workers=args.workers,
+            budget=_make_budget(args),
+            match=args.match,
+            grammar=grammar,
+            prefilter=args.prefilter,
+        )
+    if mapping_cache is not None:
+        mapping_cache.save()
+    if args.record_run is not None:
+        from .run_store import RunStore
+
+        with RunStore(Path(args.run_store)) as store:
+            store.record(args.record_run, gt_path, eval_path, result)
+        if not args.debug:
+            result.pop("cells", None)
+            result.pop("mapping_cache", None)
+    result.update(resolution)
 
     report_text = format_report(result, args.format)
     out_path.write_text(report_text, encoding="utf-8")
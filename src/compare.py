@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Sequence
+
+from .docx_utils import CellText, TokenGrammar, extract_table_cell_texts, strip_tokens_by_family
+from .evaluator import (
+    MATCH_MODES,
+    CellEvaluation,
+    EvaluationBudget,
+    _build_result,
+    _document_deadline,
+    _evaluate_cells,
+    _evaluate_cells_identity,
+    _fork_caches,
+    _merge_caches,
+    make_executor,
+)
+from .hashing import content_hash
+from .mapping_cache import MappingCache
+
+_CellKey = tuple[int, int, int]
+
+
+@dataclass
+class PreparedGroundTruth:
+    """GT cells with their token-free base text and tokens, computed once per GT."""
+
+    cells: list[CellText]
+    stripped: dict[_CellKey, tuple[str, list[tuple[int, str, str]]]]
+    grammar: TokenGrammar | None = None
+
+
+def prepare_ground_truth(gt_cells: list[CellText], grammar: TokenGrammar | None = None) -> PreparedGroundTruth:
+    stripped = {(c.table_index, c.row_index, c.col_index): strip_tokens_by_family(c.text, grammar) for c in gt_cells}
+    return PreparedGroundTruth(cells=gt_cells, stripped=stripped, grammar=grammar)
+
+
+def _score_candidate(
+    prepared: PreparedGroundTruth,
+    eval_path: Path,
+    mapping_cache: MappingCache | None,
+    budget: EvaluationBudget | None,
+    match: str,
+) -> tuple[list[CellEvaluation], dict]:
+    evaluate = _evaluate_cells_identity if match == "identity" else _evaluate_cells
+    return evaluate(
+        prepared.cells,
+        extract_table_cell_texts(eval_path),
+        False,
+        mapping_cache,
+        budget,
+        _document_deadline(budget),
+        prepared.grammar,
+        prepared.stripped,
+    )
+
+
+def _cell_outcome(e: CellEvaluation | None, match: str) -> dict:
+    fields = ("correct", "missed", "misplaced") + (("swapped", "duplicate") if match == "identity" else ())
+    return {f: getattr(e, f) if e is not None else 0 for f in fields}
+
+
+def _disagreements(names: list[str], evaluations: list[list[CellEvaluation]], match: str) -> list[dict]:
+    by_key = [{(e.table_index, e.row_index, e.col_index): e for e in evs} for evs in evaluations]
+    cells: list[dict] = []
+    for k in sorted(set().union(*by_key)):
+        outcomes = {name: _cell_outcome(index.get(k), match) for name, index in zip(names, by_key)}
+        if len({tuple(o.values()) for o in outcomes.values()}) < 2:
+            continue
+        # GT-side counts are identical for every candidate that has the cell
+        gt_tokens = next(len(index[k].gt_positions) for index in by_key if k in index)
+        cells.append({"table": k[0], "row": k[1], "col": k[2], "gt_tokens": gt_tokens, "candidates": outcomes})
+    return cells
+
+
+def compare_documents(
+    gt_path: Path,
+    eval_paths: Sequence[Path],
+    mapping_cache: MappingCache | None = None,
+    executor: str = "serial",
+    max_workers: int | None = None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    grammar: TokenGrammar | None = None,
+) -> dict:
+    """Score several candidate documents against one GT.
+
+    The GT is extracted and stripped once and shared by every candidate, the mapping
+    cache is shared too (so cell texts several candidates have in common are diffed
+    once; with threads, once per candidate unless already cached), and byte-identical
+    candidates are scored once. Candidates are ranked by
+    ``correct`` (then fewest ``misplaced``, then fewest ``missed``); cells where the
+    candidates' per-cell outcomes differ are listed under ``disagreements``.
+    """
+    if match not in MATCH_MODES:
+        raise ValueError(f"Unsupported match mode: {match}")
+    prepared = prepare_ground_truth(extract_table_cell_texts(gt_path), grammar)
+
+    unique: dict[str, Path] = {}
+    content_of: list[str] = []
+    for path in eval_paths:
+        digest = content_hash(path)
+        unique.setdefault(digest, path)
+        content_of.append(digest)
+
+    digests = list(unique)
+    score = partial(_score_candidate, prepared, budget=budget, match=match)
+    pool = make_executor(executor, max_workers)
+    if pool is None:
+        parts = [score(unique[d], mapping_cache) for d in digests]
+    else:
+        caches = _fork_caches(mapping_cache, executor, len(digests))
+        with pool:
+            futures = [pool.submit(score, unique[d], cache) for d, cache in zip(digests, caches)]
+            parts = [f.result() for f in futures]
+        _merge_caches(mapping_cache, caches)
+    scored = dict(zip(digests, parts))
+
+    names = [str(p) for p in eval_paths]
+    candidates: list[dict] = []
+    for name, digest in zip(names, content_of):
+        evaluations, totals = scored[digest]
+        candidates.append({"candidate": name, **_build_result(evaluations, totals, False, match, None, grammar)})
+    ranking = sorted(candidates, key=lambda c: (-c["correct"], c["misplaced"], c["missed"]))
+    for rank, candidate in enumerate(ranking, start=1):
+        candidate["rank"] = rank
+
+    result: dict = {
+        "gt_total": sum(len(tokens) for _, tokens in prepared.stripped.values()),
+        "candidates": candidates,
+        "disagreements": _disagreements(names, [scored[d][0] for d in content_of], match),
+    }
+    if mapping_cache is not None:
+        result["mapping_cache"] = mapping_cache.stats()
+    return result
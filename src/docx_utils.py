@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import re
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
 from docx import Document  # type: ignore[import-not-found]
+from docx.oxml import parse_xml  # type: ignore[import-not-found]
+from docx.table import Table  # type: ignore[import-not-found]
+from lxml import etree  # type: ignore[import-not-found]
 
 TOKEN_REGEX = re.compile(r"(?i)cell_\d+")
+_WHITESPACE_REGEX = re.compile(r"\s+")
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_DOCUMENT_PART = "word/document.xml"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
 
 
 @dataclass(frozen=True)
@@ -22,7 +31,7 @@ class CellText:
 def _normalize_whitespace(text: str) -> str:
     # Convert NBSP to space and collapse whitespace
     text = text.replace("\u00A0", " ")
-    text = re.sub(r"\s+", " ", text)
+    text = _WHITESPACE_REGEX.sub(" ", text)
     return text.strip()
 
 
@@ -34,8 +43,11 @@ def _iter_tables(document: Document):
 def _get_merged_map(table) -> dict[Tuple[int, int], tuple[int, int]]:
     # Group positions by underlying CT_Tc identity using row.cells to avoid API inconsistencies
     groups_by_id: dict[int, list[tuple[int, int]]] = {}
+    # Keep the cell proxies alive: lxml element ids are only stable while referenced
+    alive: list[list] = []
     for r_idx, row in enumerate(table.rows):
         row_cells = list(row.cells)
+        alive.append(row_cells)
         for c_idx, cell in enumerate(row_cells):
             key = id(cell._tc)
             groups_by_id.setdefault(key, []).append((r_idx, c_idx))
@@ -62,71 +74,273 @@ def _merged_rect(owner_map: dict[Tuple[int, int], tuple[int, int]], target: tupl
     return (rs, cs, re_max, ce_max)
 
 
+def _table_cell_texts(t_idx: int, table) -> list[CellText]:
+    results: list[CellText] = []
+    owner_map = _get_merged_map(table)
+    seen_owners: set[tuple[int, int]] = set()
+    rows_count = len(table.rows)
+    cols_count = len(table.columns) if rows_count > 0 else 0
+    for r_idx in range(rows_count):
+        for c_idx in range(cols_count):
+            owner = owner_map[(r_idx, c_idx)]
+            if owner in seen_owners:
+                continue
+            seen_owners.add(owner)
+            rect = _merged_rect(owner_map, (r_idx, c_idx))
+
+            # Build combined text across positions in the merged rectangle
+            rs, cs, re_idx, ce_idx = rect
+            parts: list[str] = []
+            seen_cells: set[int] = set()
+            alive: list = []
+            for rr in range(rs, re_idx + 1):
+                row_cells = list(table.rows[rr].cells)
+                for cc in range(cs, ce_idx + 1):
+                    cell_obj = row_cells[cc]
+                    key = id(cell_obj._tc)
+                    if key in seen_cells:
+                        continue
+                    seen_cells.add(key)
+                    alive.append(cell_obj)
+                    parts.append(cell_obj.text)
+            text = _normalize_whitespace("\n".join(parts))
+
+            results.append(
+                CellText(
+                    table_index=t_idx,
+                    row_index=owner[0],
+                    col_index=owner[1],
+                    merged_rect=rect,
+                    text=text,
+                )
+            )
+    return results
+
+
 def extract_table_cell_texts(doc_path: Path) -> list[CellText]:
     doc = Document(str(doc_path))
     results: list[CellText] = []
     for t_idx, table in _iter_tables(doc):
-        owner_map = _get_merged_map(table)
-        seen_owners: set[tuple[int, int]] = set()
-        rows_count = len(table.rows)
-        cols_count = len(table.columns) if rows_count > 0 else 0
-        for r_idx in range(rows_count):
-            for c_idx in range(cols_count):
-                owner = owner_map[(r_idx, c_idx)]
-                if owner in seen_owners:
-                    continue
-                seen_owners.add(owner)
-                rect = _merged_rect(owner_map, (r_idx, c_idx))
-
-                # Build combined text across positions in the merged rectangle
-                rs, cs, re_idx, ce_idx = rect
-                parts: list[str] = []
-                seen_cells: set[int] = set()
-                for rr in range(rs, re_idx + 1):
-                    row_cells = list(table.rows[rr].cells)
-                    for cc in range(cs, ce_idx + 1):
-                        cell_obj = row_cells[cc]
-                        key = id(cell_obj._tc)
-                        if key in seen_cells:
-                            continue
-                        seen_cells.add(key)
-                        parts.append(cell_obj.text)
-                text = _normalize_whitespace("\n".join(parts))
-
-                results.append(
-                    CellText(
-                        table_index=t_idx,
-                        row_index=owner[0],
-                        col_index=owner[1],
-                        merged_rect=rect,
-                        text=text,
-                    )
-                )
+        results.extend(_table_cell_texts(t_idx, table))
     return results
 
 
-def find_tokens(text: str) -> list[tuple[int, int]]:
+_MERGE_XPATH = (
+    "./w:tr/w:tc/w:tcPr/w:gridSpan[@w:val != '1'] | ./w:tr/w:tc/w:tcPr/w:vMerge"
+    " | ./w:tr/w:trPr/w:gridBefore | ./w:tr/w:trPr/w:gridAfter"
+)
+
+
+def _plain_table_texts(tbl) -> list[list[str]] | None:
+    # Normalized text of every cell straight from the w:tbl element, or None when the
+    # table has merges or ragged rows and needs the full merged-rect logic. Each w:tc
+    # then owns exactly one grid cell, so (row, col) is just its position in the XML.
+    if tbl.xpath(_MERGE_XPATH):
+        return None
+    cols = len(tbl.tblGrid.gridCol_lst)
+    rows: list[list[str]] = []
+    for tr in tbl.tr_lst:
+        tcs = tr.tc_lst
+        if len(tcs) != cols:
+            return None
+        # Same text as _Cell.text; paragraph text joins runs, so split tokens are kept whole
+        rows.append([_normalize_whitespace("\n".join(p.text for p in tc.p_lst)) for tc in tcs])
+    return rows
+
+
+def extract_token_cell_texts(
+    gt_path: Path,
+    eval_path: Path,
+    grammar: TokenGrammar | None = None,
+) -> tuple[list[CellText], list[CellText], int]:
+    """Extract only the cells that carry a token in the GT or the eval document.
+
+    Cells without tokens on either side add nothing to any total, so they are never
+    turned into CellText; only their number is returned, as the third element. Plain
+    tables are read straight from the XML; a table with merged cells on either side
+    goes through extract_table_cell_texts' logic unfiltered.
+    """
+    scanner = grammar or DEFAULT_GRAMMAR
+    gt_tables = list(_iter_tables(Document(str(gt_path))))
+    ev_tables = list(_iter_tables(Document(str(eval_path))))
+    gt_cells: list[CellText] = []
+    ev_cells: list[CellText] = []
+    skipped = 0
+    for t_idx in range(max(len(gt_tables), len(ev_tables))):
+        sides = [tables[t_idx][1] if t_idx < len(tables) else None for tables in (gt_tables, ev_tables)]
+        plain = [_plain_table_texts(t._tbl) if t is not None else [] for t in sides]
+        if any(p is None for p in plain):
+            for table, out in zip(sides, (gt_cells, ev_cells)):
+                if table is not None:
+                    out.extend(_table_cell_texts(t_idx, table))
+            continue
+        gt_rows, ev_rows = plain
+        keys = {(r, c) for rows in plain for r, row in enumerate(rows) for c in range(len(row))}
+        for r, c in sorted(keys):
+            texts = [rows[r][c] if r < len(rows) and c < len(rows[r]) else None for rows in (gt_rows, ev_rows)]
+            if not any(t and scanner.regex.search(t) for t in texts):
+                skipped += 1
+                continue
+            for text, out in zip(texts, (gt_cells, ev_cells)):
+                if text is not None:
+                    out.append(CellText(t_idx, r, c, (r, c, r, c), text))
+    return gt_cells, ev_cells, skipped
+
+
+def _main_document_part(archive: zipfile.ZipFile) -> str:
+    # The main part is usually word/document.xml, but the package relationships are authoritative
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return _DOCUMENT_PART
+    for rel in rels:
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL and rel.get("TargetMode") != "External":
+            return rel.get("Target", _DOCUMENT_PART).lstrip("/")
+    return _DOCUMENT_PART
+
+
+def iter_table_cell_texts(doc_path: Path) -> Iterator[list[CellText]]:
+    """Yield the cells of each body-level table, one table at a time.
+
+    Streams word/document.xml with iterparse instead of loading the whole document,
+    releasing every body element once handled, so memory is bounded by the largest
+    table rather than by the document. Yields the same cells, in the same order, as
+    extract_table_cell_texts.
+    """
+    body_tag = f"{{{_W_NS}}}body"
+    tbl_tag = f"{{{_W_NS}}}tbl"
+    t_idx = 0
+    with zipfile.ZipFile(doc_path) as archive, archive.open(_main_document_part(archive)) as stream:
+        for _, elem in etree.iterparse(stream, events=("end",), resolve_entities=False, no_network=True):
+            parent = elem.getparent()
+            if parent is None or parent.tag != body_tag:
+                continue
+            if elem.tag == tbl_tag:
+                # Entities are not resolved (as in python-docx), and an unresolved reference
+                # cannot be re-parsed without the DTD; python-docx's text ignores the
+                # reference and the text after it, so drop both
+                for entity in list(elem.iter(etree.Entity)):
+                    entity.getparent().remove(entity)
+                # Re-parse just this table so python-docx's element classes apply
+                table = Table(parse_xml(etree.tostring(elem)), None)
+                cells = _table_cell_texts(t_idx, table)
+                del table
+                yield cells
+                t_idx += 1
+            # Release this element and everything already processed before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+class TokenGrammar:
+    """One or more named token families compiled into a single scanner.
+
+    Each family is a regex; all of them are joined into one alternation so a text is
+    scanned once however many families are active. A leading inline flag group such
+    as ``(?i)`` applies to that family only. Where matches overlap, the earliest
+    start wins, then the family listed first. Token ids are the matched text,
+    upper-cased for case-insensitive families. Group numbers shift once patterns are
+    combined, so backreferences must use named groups.
+    """
+
+    def __init__(self, families: dict[str, str]) -> None:
+        if not families:
+            raise ValueError("A token grammar needs at least one pattern")
+        self.families: tuple[str, ...] = tuple(families)
+        self.patterns: dict[str, str] = dict(families)
+        self._fold_case: dict[str, bool] = {}
+        self._group_to_family: dict[str, str] = {}
+        alternatives: list[str] = []
+        for i, (name, pattern) in enumerate(families.items()):
+            try:
+                compiled = re.compile(pattern)
+            except re.error as exc:
+                raise ValueError(f"Invalid pattern for token family {name!r}: {exc}") from exc
+            if compiled.match(""):
+                raise ValueError(f"Pattern for token family {name!r} matches the empty string")
+            self._fold_case[name] = bool(compiled.flags & re.IGNORECASE)
+            group = f"_t{i}"
+            self._group_to_family[group] = name
+            # The empty marker group goes after the pattern, not around it: a capturing
+            # group as the first op hides each family's leading literal from re's
+            # prefix scan and makes the combined scanner several times slower
+            alternatives.append(f"{_scope_inline_flags(pattern)}(?P<{group}>)")
+        try:
+            self.regex = re.compile("|".join(alternatives))
+        except re.error as exc:
+            raise ValueError(f"Token patterns cannot be combined: {exc}") from exc
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[str]) -> TokenGrammar:
+        # Parse CLI-style "name=regex" entries
+        families: dict[str, str] = {}
+        for spec in specs:
+            name, sep, pattern = spec.partition("=")
+            name = name.strip()
+            if not sep or not name or not pattern:
+                raise ValueError(f"Expected NAME=REGEX, got {spec!r}")
+            if name in families:
+                raise ValueError(f"Duplicate token family: {name!r}")
+            families[name] = pattern
+        return cls(families)
+
+    def scan(self, text: str) -> Iterator[tuple[int, int, str, str]]:
+        # Yield (start, end, family, token_id) for every token in text
+        group_to_family = self._group_to_family
+        fold_case = self._fold_case
+        for m in self.regex.finditer(text):
+            family = group_to_family[m.lastgroup]
+            token = m.group(0)
+            yield m.start(), m.end(), family, token.upper() if fold_case[family] else token
+
+
+_INLINE_FLAGS_REGEX = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def _scope_inline_flags(pattern: str) -> str:
+    # "(?i)cell_\d+" -> "(?i:cell_\d+)": global flags are only legal at the very start
+    # of the combined expression, so turn them into a scoped group
+    m = _INLINE_FLAGS_REGEX.match(pattern)
+    if not m:
+        return f"(?:{pattern})"
+    return f"(?{m.group(1)}:{pattern[m.end():]})"
+
+
+DEFAULT_GRAMMAR = TokenGrammar({"cell": TOKEN_REGEX.pattern})
+
+
+def find_tokens(text: str, grammar: TokenGrammar | None = None) -> list[tuple[int, int]]:
     # Return list of (start, end) indices for tokens
-    matches: list[tuple[int, int]] = []
-    for m in TOKEN_REGEX.finditer(text):
-        matches.append((m.start(), m.end()))
-    return matches
+    return [(start, end) for start, end, _, _ in (grammar or DEFAULT_GRAMMAR).scan(text)]
 
 
-def strip_tokens(text: str) -> tuple[str, list[int]]:
-    # Remove tokens and return (base_text, token_starts_in_base_coords)
-    starts_in_base: list[int] = []
+def strip_tokens_by_family(text: str, grammar: TokenGrammar | None = None) -> tuple[str, list[tuple[int, str, str]]]:
+    # Remove tokens and return (base_text, [(start_in_base, family, normalized_token_id), ...])
+    tokens: list[tuple[int, str, str]] = []
     out_chars: list[str] = []
     i = 0
-    removed_so_far = 0
-    for m in TOKEN_REGEX.finditer(text):
-        # text[i:m.start()] remains in base
-        out_chars.append(text[i : m.start()])
+    base_len = 0
+    for start, end, family, token_id in (grammar or DEFAULT_GRAMMAR).scan(text):
+        # text[i:start] remains in base
+        chunk = text[i:start]
+        out_chars.append(chunk)
+        base_len += len(chunk)
         # The start position of token in base equals current base length
-        starts_in_base.append(sum(len(chunk) for chunk in out_chars))
-        i = m.end()
+        tokens.append((base_len, family, token_id))
+        i = end
     out_chars.append(text[i:])
     base_text = "".join(out_chars)
-    return (base_text, starts_in_base)
+    return (base_text, tokens)
+
 
+def strip_tokens_with_ids(text: str, grammar: TokenGrammar | None = None) -> tuple[str, list[tuple[int, str]]]:
+    # Remove tokens and return (base_text, [(start_in_base, normalized_token_id), ...])
+    base_text, tokens = strip_tokens_by_family(text, grammar)
+    return (base_text, [(start, token_id) for start, _, token_id in tokens])
 
+
+def strip_tokens(text: str, grammar: TokenGrammar | None = None) -> tuple[str, list[int]]:
+    # Remove tokens and return (base_text, token_starts_in_base_coords)
+    base_text, tokens = strip_tokens_by_family(text, grammar)
+    return (base_text, [start for start, _, _ in tokens])
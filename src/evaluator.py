@@ -1,12 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 
 from difflib import SequenceMatcher
 
-from .docx_utils import CellText, extract_table_cell_texts, strip_tokens
+from .docx_utils import (
+    CellText,
+    TokenGrammar,
+    extract_table_cell_texts,
+    extract_token_cell_texts,
+    iter_table_cell_texts,
+    strip_tokens_by_family,
+)
+from .memory import MemoryTracker
+from .mapping_cache import MappingCache
+
+EXECUTORS = ("serial", "threads", "processes")
+MATCH_MODES = ("position", "identity")
+
+# Context length used by the fallback mapping to re-locate a position in the eval text
+_ANCHOR_CHARS = 24
+# Largest middle diff the fallback runs once the document deadline has passed (a few ms)
+_DEADLINE_MAX_WORK = 250_000
+
+
+@dataclass(frozen=True)
+class EvaluationBudget:
+    # Work is len(gt_base) * len(eval_base), roughly what SequenceMatcher(autojunk=False) costs
+    max_cell_work: int | None = None
+    # Once a document has used this much wall time, remaining cells use the fallback mapping
+    max_document_seconds: float | None = None
 
 
 @dataclass
@@ -21,6 +50,30 @@ class CellEvaluation:
     correct: int
     missed: int
     misplaced: int
+    degraded: bool = False
+    # Identity mode only: normalized token ids and the extra eval-side categories
+    gt_ids: list[str] = field(default_factory=list)
+    eval_ids: list[str] = field(default_factory=list)
+    swapped: int = 0
+    duplicate: int = 0
+
+
+_FAMILY_FIELDS = ("gt_total", "eval_total", "correct", "misplaced", "missed", "swapped", "duplicate")
+
+
+def _empty_totals() -> dict:
+    return {
+        "gt_total": 0,
+        "eval_total": 0,
+        "correct": 0,
+        "misplaced": 0,
+        "missed": 0,
+        "swapped": 0,
+        "duplicate": 0,
+        "degraded_cells": 0,
+        # family name -> counts over _FAMILY_FIELDS
+        "families": {},
+    }
 
 
 def _map_positions(gt_base: str, eval_base: str, gt_positions: list[int]) -> list[int]:
@@ -52,9 +105,146 @@ def _map_positions(gt_base: str, eval_base: str, gt_positions: list[int]) -> lis
     return [map_index(pos) for pos in gt_positions]
 
 
-def _evaluate_cells(gt_cells: list[CellText], eval_cells: list[CellText], debug: bool) -> tuple[list[CellEvaluation], dict]:
+def _anchor_position(gt_mid: str, eval_mid: str, i: int) -> int | None:
+    # Map via a unique occurrence of the text just before (or after) position i,
+    # shrinking the context so edits right next to the token do not hide the anchor
+    width = _ANCHOR_CHARS
+    while width >= _ANCHOR_CHARS // 4:
+        left = gt_mid[max(0, i - width) : i]
+        if left:
+            at = eval_mid.find(left)
+            if at != -1 and eval_mid.find(left, at + 1) == -1:
+                return at + len(left)
+        right = gt_mid[i : i + width]
+        if right:
+            at = eval_mid.find(right)
+            if at != -1 and eval_mid.find(right, at + 1) == -1:
+                return at
+        width //= 2
+    return None
+
+
+def _map_positions_fallback(
+    gt_base: str,
+    eval_base: str,
+    gt_positions: list[int],
+    max_work: int | None,
+) -> list[int]:
+    # Cheap approximation of _map_positions for cells over budget: exact inside the
+    # common prefix/suffix, a real diff of the middle if that fits the budget,
+    # otherwise unique-anchor lookup and finally proportional placement.
+    limit = min(len(gt_base), len(eval_base))
+    prefix = 0
+    while prefix < limit and gt_base[prefix] == eval_base[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and gt_base[-1 - suffix] == eval_base[-1 - suffix]:
+        suffix += 1
+    gt_mid = gt_base[prefix : len(gt_base) - suffix]
+    eval_mid = eval_base[prefix : len(eval_base) - suffix]
+    shift = len(eval_base) - len(gt_base)
+
+    middle = [p - prefix for p in gt_positions if prefix < p < len(gt_base) - suffix]
+    diffed: dict[int, int] = {}
+    if middle and (max_work is None or len(gt_mid) * len(eval_mid) <= max_work):
+        diffed = dict(zip(middle, _map_positions(gt_mid, eval_mid, middle)))
+
+    mapped: list[int] = []
+    for p in gt_positions:
+        if p <= prefix:
+            mapped.append(p)
+        elif p >= len(gt_base) - suffix:
+            mapped.append(p + shift)
+        elif p - prefix in diffed:
+            mapped.append(prefix + diffed[p - prefix])
+        else:
+            i = p - prefix
+            at = _anchor_position(gt_mid, eval_mid, i)
+            if at is None:
+                at = round(i * len(eval_mid) / len(gt_mid)) if gt_mid else 0
+            mapped.append(prefix + at)
+    return mapped
+
+
+def _over_budget(gt_base: str, eval_base: str, budget: EvaluationBudget | None, deadline: float | None) -> bool:
+    if budget is None:
+        return False
+    if budget.max_cell_work is not None and len(gt_base) * len(eval_base) > budget.max_cell_work:
+        return True
+    return deadline is not None and time.monotonic() > deadline
+
+
+def _map_cell(
+    gt_base: str,
+    eval_base: str,
+    gt_positions: list[int],
+    mapping_cache: MappingCache | None,
+    budget: EvaluationBudget | None,
+    deadline: float | None,
+) -> tuple[list[int], bool]:
+    # Returns (mapped positions, degraded). Identical texts and token-free cells are
+    # cheaper than hashing, so only real diffs go through the memo; an exact memoized
+    # result is used even for cells that are over budget.
+    if not gt_positions:
+        return [], False
+    if gt_base == eval_base:
+        return gt_positions.copy(), False
+    key = None
+    if mapping_cache is not None:
+        key = mapping_cache.key(gt_base, eval_base, gt_positions)
+        mapped = mapping_cache.get(key)
+        if mapped is not None:
+            return mapped, False
+    if _over_budget(gt_base, eval_base, budget, deadline):
+        max_work = budget.max_cell_work
+        if deadline is not None and time.monotonic() > deadline:
+            # Out of time: never fall back to an unbounded diff of the middle section
+            max_work = min(max_work or _DEADLINE_MAX_WORK, _DEADLINE_MAX_WORK)
+        return _map_positions_fallback(gt_base, eval_base, gt_positions, max_work), True
+    mapped = _map_positions(gt_base, eval_base, gt_positions)
+    if key is not None:
+        mapping_cache.put(key, mapped)
+    return mapped, False
+
+
+def _document_deadline(budget: EvaluationBudget | None) -> float | None:
+    if budget is None or budget.max_document_seconds is None:
+        return None
+    return time.monotonic() + budget.max_document_seconds
+
+
+def _family_totals(totals: dict, family: str) -> dict:
+    families = totals["families"]
+    if family not in families:
+        families[family] = {k: 0 for k in _FAMILY_FIELDS}
+    return families[family]
+
+
+def _merge_totals(into: dict, part: dict) -> None:
+    for k, v in part.items():
+        if k == "families":
+            for family, counts in v.items():
+                target = _family_totals(into, family)
+                for f in _FAMILY_FIELDS:
+                    target[f] += counts[f]
+        else:
+            into[k] += v
+
+
+def _evaluate_cells(
+    gt_cells: list[CellText],
+    eval_cells: list[CellText],
+    debug: bool,
+    mapping_cache: MappingCache | None = None,
+    budget: EvaluationBudget | None = None,
+    deadline: float | None = None,
+    grammar: TokenGrammar | None = None,
+    gt_stripped: dict[tuple[int, int, int], tuple[str, list]] | None = None,
+) -> tuple[list[CellEvaluation], dict]:
     evaluations: list[CellEvaluation] = []
-    totals = {"gt_total": 0, "eval_total": 0, "correct": 0, "misplaced": 0, "missed": 0}
+    totals = _empty_totals()
+    if deadline is None:
+        deadline = _document_deadline(budget)
 
     # Pair cells by table order and merged top-left coordinates
     key = lambda c: (c.table_index, c.row_index, c.col_index)
@@ -69,14 +259,27 @@ def _evaluate_cells(gt_cells: list[CellText], eval_cells: list[CellText], debug:
         gt_text = gt_cell.text if gt_cell else ""
         ev_text = ev_cell.text if ev_cell else ""
 
-        gt_base, gt_positions = strip_tokens(gt_text)
-        ev_base, ev_positions = strip_tokens(ev_text)
+        prepared = gt_stripped.get(k) if gt_stripped is not None else None
+        gt_base, gt_tokens = prepared or strip_tokens_by_family(gt_text, grammar)
+        ev_base, ev_tokens = strip_tokens_by_family(ev_text, grammar)
+        gt_positions = [p for p, _, _ in gt_tokens]
+        ev_positions = [p for p, _, _ in ev_tokens]
+
+        mapped_positions, degraded = _map_cell(gt_base, ev_base, gt_positions, mapping_cache, budget, deadline)
 
-        mapped_positions = _map_positions(gt_base, ev_base, gt_positions)
+        # Correct if mapped position holds an eval token of the same family (already base coords)
+        ev_slots = {(p, family) for p, family, _ in ev_tokens}
+        correct_by_family: Counter[str] = Counter()
+        for (_, family, _), mapped in zip(gt_tokens, mapped_positions):
+            _family_totals(totals, family)["gt_total"] += 1
+            if (mapped, family) in ev_slots:
+                correct_by_family[family] += 1
+        for _, family, _ in ev_tokens:
+            _family_totals(totals, family)["eval_total"] += 1
+        for family, n in correct_by_family.items():
+            _family_totals(totals, family)["correct"] += n
 
-        # Correct if mapped position is present in eval positions set (already base coords)
-        ev_set = set(ev_positions)
-        correct = sum(1 for p in mapped_positions if p in ev_set)
+        correct = sum(correct_by_family.values())
         missed = len(gt_positions) - correct
         misplaced = len(ev_positions) - correct
 
@@ -85,6 +288,7 @@ def _evaluate_cells(gt_cells: list[CellText], eval_cells: list[CellText], debug:
         totals["correct"] += correct
         totals["missed"] += missed
         totals["misplaced"] += misplaced
+        totals["degraded_cells"] += int(degraded)
 
         evaluations.append(
             CellEvaluation(
@@ -98,25 +302,333 @@ def _evaluate_cells(gt_cells: list[CellText], eval_cells: list[CellText], debug:
                 correct=correct,
                 missed=missed,
                 misplaced=misplaced,
+                degraded=degraded,
             )
         )
 
+    for counts in totals["families"].values():
+        counts["missed"] = counts["gt_total"] - counts["correct"]
+        counts["misplaced"] = counts["eval_total"] - counts["correct"]
     return evaluations, totals
 
 
-def evaluate_documents(gt_path: Path, eval_path: Path, debug: bool = False) -> dict:
-    gt_cells = extract_table_cell_texts(gt_path)
-    ev_cells = extract_table_cell_texts(eval_path)
+def _evaluate_cells_identity(
+    gt_cells: list[CellText],
+    eval_cells: list[CellText],
+    debug: bool,
+    mapping_cache: MappingCache | None = None,
+    budget: EvaluationBudget | None = None,
+    deadline: float | None = None,
+    grammar: TokenGrammar | None = None,
+    gt_stripped: dict[tuple[int, int, int], tuple[str, list]] | None = None,
+) -> tuple[list[CellEvaluation], dict]:
+    # Like _evaluate_cells, but a token only counts as correct when the same token id
+    # sits at the mapped position. GT and eval tokens are hash-joined by id per table,
+    # so the cost stays linear in the number of tokens. Unmatched eval tokens are
+    # classified as swapped (a different GT token that is still unmatched maps to that
+    # slot), duplicate (more copies of an id the GT uses than it has) or misplaced.
+    totals = _empty_totals()
+    if deadline is None:
+        deadline = _document_deadline(budget)
 
-    evaluations, totals = _evaluate_cells(gt_cells, ev_cells, debug)
+    key = lambda c: (c.table_index, c.row_index, c.col_index)
+    gt_index: dict[tuple[int, int, int], CellText] = {key(c): c for c in gt_cells}
+    eval_index: dict[tuple[int, int, int], CellText] = {key(c): c for c in eval_cells}
+    all_keys = sorted(set(gt_index.keys()) | set(eval_index.keys()))
+
+    evaluations: dict[tuple[int, int, int], CellEvaluation] = {}
+    # table -> (family, token id) -> [(cell key, position in eval base coords)]
+    gt_by_id: dict[int, dict[tuple[str, str], list[tuple]]] = {}
+    ev_by_id: dict[int, dict[tuple[str, str], list[tuple]]] = {}
+    # table -> slot -> GT ids mapped there that no eval token has matched yet
+    gt_slots: dict[int, dict[tuple, Counter]] = {}
+
+    for k in all_keys:
+        gt_cell = gt_index.get(k)
+        ev_cell = eval_index.get(k)
+        prepared = gt_stripped.get(k) if gt_stripped is not None else None
+        gt_base, gt_tokens = prepared or strip_tokens_by_family(gt_cell.text if gt_cell else "", grammar)
+        ev_base, ev_tokens = strip_tokens_by_family(ev_cell.text if ev_cell else "", grammar)
+        gt_positions = [p for p, _, _ in gt_tokens]
+        ev_positions = [p for p, _, _ in ev_tokens]
+        mapped_positions, degraded = _map_cell(gt_base, ev_base, gt_positions, mapping_cache, budget, deadline)
 
+        table_gt = gt_by_id.setdefault(k[0], {})
+        table_slots = gt_slots.setdefault(k[0], {})
+        for (_, family, token_id), mapped in zip(gt_tokens, mapped_positions):
+            table_gt.setdefault((family, token_id), []).append((k, mapped))
+            table_slots.setdefault((k, mapped), Counter())[(family, token_id)] += 1
+            _family_totals(totals, family)["gt_total"] += 1
+        table_ev = ev_by_id.setdefault(k[0], {})
+        for pos, family, token_id in ev_tokens:
+            table_ev.setdefault((family, token_id), []).append((k, pos))
+            _family_totals(totals, family)["eval_total"] += 1
+
+        totals["gt_total"] += len(gt_positions)
+        totals["eval_total"] += len(ev_positions)
+        totals["degraded_cells"] += int(degraded)
+        evaluations[k] = CellEvaluation(
+            table_index=k[0],
+            row_index=k[1],
+            col_index=k[2],
+            merged_rect=(gt_cell or ev_cell).merged_rect if (gt_cell or ev_cell) else (0, 0, 0, 0),
+            gt_positions=gt_positions,
+            eval_positions=ev_positions,
+            mapped_eval_positions=mapped_positions,
+            correct=0,
+            missed=len(gt_positions),
+            misplaced=0,
+            degraded=degraded,
+            gt_ids=[t for _, _, t in gt_tokens],
+            eval_ids=[t for _, _, t in ev_tokens],
+        )
+
+    for table, table_ev in ev_by_id.items():
+        table_gt = gt_by_id.get(table, {})
+        table_slots = gt_slots.get(table, {})
+        # Match every id first, so a GT token already matched at a slot cannot make
+        # another eval token there count as swapped
+        unmatched: list[tuple[tuple[str, str], tuple]] = []
+        extra_copies: dict[tuple[str, str], int] = {}
+        for token_key, ev_occurrences in table_ev.items():
+            gt_occurrences = table_gt.get(token_key, [])
+            remaining = Counter(gt_occurrences)
+            # An id the GT never uses is an extra token, not a copy of one
+            extra_copies[token_key] = max(0, len(ev_occurrences) - len(gt_occurrences)) if gt_occurrences else 0
+            for slot in ev_occurrences:
+                if remaining[slot] > 0:
+                    remaining[slot] -= 1
+                    table_slots[slot][token_key] -= 1
+                    cell = evaluations[slot[0]]
+                    cell.correct += 1
+                    cell.missed -= 1
+                    totals["correct"] += 1
+                    _family_totals(totals, token_key[0])["correct"] += 1
+                else:
+                    unmatched.append((token_key, slot))
+        for token_key, slot in unmatched:
+            cell = evaluations[slot[0]]
+            if any(n > 0 for other, n in table_slots.get(slot, Counter()).items() if other != token_key):
+                cell.swapped += 1
+                outcome = "swapped"
+            elif extra_copies[token_key] > 0:
+                extra_copies[token_key] -= 1
+                cell.duplicate += 1
+                outcome = "duplicate"
+            else:
+                cell.misplaced += 1
+                outcome = "misplaced"
+            totals[outcome] += 1
+            _family_totals(totals, token_key[0])[outcome] += 1
+    totals["missed"] = totals["gt_total"] - totals["correct"]
+    for counts in totals["families"].values():
+        counts["missed"] = counts["gt_total"] - counts["correct"]
+
+    return [evaluations[k] for k in all_keys], totals
+
+
+def make_executor(kind: str, max_workers: int | None = None) -> Executor | None:
+    if kind == "serial":
+        return None
+    if kind == "threads":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if kind == "processes":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unsupported executor: {kind}")
+
+
+def _fork_caches(mapping_cache: MappingCache | None, executor: str, tasks: int) -> list[MappingCache | None]:
+    # Each thread task gets a private fork, so cell lookups never take a shared lock;
+    # together the forks stay within the cache's byte budget. A process pool would
+    # only see a pickled copy of the cache, so it gets none.
+    if mapping_cache is None or executor != "threads":
+        return [None] * tasks
+    return [mapping_cache.fork(mapping_cache.max_bytes // max(1, tasks)) for _ in range(tasks)]
+
+
+def _merge_caches(mapping_cache: MappingCache | None, forks: list[MappingCache | None]) -> None:
+    for fork in forks:
+        if fork is not None:
+            mapping_cache.merge(fork)
+
+
+def _evaluate_tables(
+    gt_cells: list[CellText],
+    eval_cells: list[CellText],
+    debug: bool,
+    mapping_cache: MappingCache | None,
+    executor: str,
+    max_workers: int | None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    deadline: float | None = None,
+    grammar: TokenGrammar | None = None,
+) -> tuple[list[CellEvaluation], dict]:
+    # Tables are independent: each task builds its own evaluations and totals,
+    # which are merged in table order afterwards (no shared accumulator)
+    if match not in MATCH_MODES:
+        raise ValueError(f"Unsupported match mode: {match}")
+    evaluate = _evaluate_cells_identity if match == "identity" else _evaluate_cells
+    if deadline is None:
+        deadline = _document_deadline(budget)
+    pool = make_executor(executor, max_workers)
+    if pool is None:
+        return evaluate(gt_cells, eval_cells, debug, mapping_cache, budget, deadline, grammar)
+
+    gt_by_table: dict[int, list[CellText]] = {}
+    ev_by_table: dict[int, list[CellText]] = {}
+    for c in gt_cells:
+        gt_by_table.setdefault(c.table_index, []).append(c)
+    for c in eval_cells:
+        ev_by_table.setdefault(c.table_index, []).append(c)
+    tables = sorted(set(gt_by_table) | set(ev_by_table))
+    caches = _fork_caches(mapping_cache, executor, len(tables))
+
+    with pool:
+        futures = [
+            pool.submit(
+                evaluate, gt_by_table.get(t, []), ev_by_table.get(t, []), debug, cache, budget, deadline, grammar
+            )
+            for t, cache in zip(tables, caches)
+        ]
+        parts = [f.result() for f in futures]
+    _merge_caches(mapping_cache, caches)
+
+    evaluations: list[CellEvaluation] = []
+    totals = _empty_totals()
+    for part_evaluations, part_totals in parts:
+        evaluations.extend(part_evaluations)
+        _merge_totals(totals, part_totals)
+    return evaluations, totals
+
+
+def evaluate_documents(
+    gt_path: Path,
+    eval_path: Path,
+    debug: bool = False,
+    mapping_cache: MappingCache | None = None,
+    executor: str = "serial",
+    max_workers: int | None = None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    grammar: TokenGrammar | None = None,
+    prefilter: bool = False,
+) -> dict:
+    # The prefilter drops cells with no tokens on either side before building them;
+    # totals are unchanged, but debug output would lose those cells, so it is skipped then
+    skipped = None
+    if prefilter and not debug:
+        gt_cells, ev_cells, skipped = extract_token_cell_texts(gt_path, eval_path, grammar)
+    else:
+        gt_cells = extract_table_cell_texts(gt_path)
+        ev_cells = extract_table_cell_texts(eval_path)
+    result = evaluate_cell_texts(
+        gt_cells,
+        ev_cells,
+        debug=debug,
+        mapping_cache=mapping_cache,
+        executor=executor,
+        max_workers=max_workers,
+        budget=budget,
+        match=match,
+        grammar=grammar,
+    )
+    if skipped is not None:
+        result["skipped_cells"] = skipped
+    return result
+
+
+def evaluate_document_pairs(
+    pairs: Sequence[tuple[Path, Path]],
+    debug: bool = False,
+    mapping_cache: MappingCache | None = None,
+    executor: str = "threads",
+    max_workers: int | None = None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    grammar: TokenGrammar | None = None,
+    prefilter: bool = False,
+) -> list[dict]:
+    # One task per (gt, eval) pair; results come back in input order
+    pool = make_executor(executor, max_workers)
+    if pool is None:
+        return [
+            evaluate_documents(
+                gt,
+                ev,
+                debug=debug,
+                mapping_cache=mapping_cache,
+                budget=budget,
+                match=match,
+                grammar=grammar,
+                prefilter=prefilter,
+            )
+            for gt, ev in pairs
+        ]
+    caches = _fork_caches(mapping_cache, executor, len(pairs))
+    task = partial(
+        evaluate_documents,
+        debug=debug,
+        budget=budget,
+        match=match,
+        grammar=grammar,
+        prefilter=prefilter,
+    )
+    with pool:
+        futures = [pool.submit(task, gt, ev, mapping_cache=cache) for (gt, ev), cache in zip(pairs, caches)]
+        results = [f.result() for f in futures]
+    _merge_caches(mapping_cache, caches)
+    return results
+
+
+def evaluate_cell_texts(
+    gt_cells: list[CellText],
+    eval_cells: list[CellText],
+    debug: bool = False,
+    mapping_cache: MappingCache | None = None,
+    executor: str = "serial",
+    max_workers: int | None = None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    grammar: TokenGrammar | None = None,
+) -> dict:
+    # Same as evaluate_documents, for callers that already hold extracted cells
+    # (e.g. a cached GT side reused across many eval documents)
+    evaluations, totals = _evaluate_tables(
+        gt_cells, eval_cells, debug, mapping_cache, executor, max_workers, budget=budget, match=match, grammar=grammar
+    )
+    return _build_result(evaluations, totals, debug, match, mapping_cache, grammar)
+
+
+def _build_result(
+    evaluations: list[CellEvaluation],
+    totals: dict,
+    debug: bool,
+    match: str,
+    mapping_cache: MappingCache | None,
+    grammar: TokenGrammar | None = None,
+) -> dict:
     result: dict = {
         "gt_total": totals["gt_total"],
         "eval_total": totals["eval_total"],
         "correct": totals["correct"],
         "misplaced": totals["misplaced"],
         "missed": totals["missed"],
+        # Cells mapped with the cheaper fallback because they exceeded the budget
+        "degraded_cells": totals["degraded_cells"],
     }
+    if match == "identity":
+        result["swapped"] = totals["swapped"]
+        result["duplicate"] = totals["duplicate"]
+    if grammar is not None and len(grammar.families) > 1:
+        # Per-family breakdown; only meaningful (and only reported) with several families
+        result["families"] = {
+            family: dict(totals["families"].get(family) or {k: 0 for k in _FAMILY_FIELDS})
+            for family in grammar.families
+        }
+        if match != "identity":
+            for counts in result["families"].values():
+                del counts["swapped"], counts["duplicate"]
 
     if debug:
         # Include per-cell details
@@ -132,14 +644,70 @@ def evaluate_documents(gt_path: Path, eval_path: Path, debug: bool = False) -> d
                 "correct": e.correct,
                 "missed": e.missed,
                 "misplaced": e.misplaced,
+                "degraded": e.degraded,
             }
             for e in evaluations
         ]
+        if match == "identity":
+            for cell, e in zip(result["cells"], evaluations):
+                cell.update(gt_ids=e.gt_ids, eval_ids=e.eval_ids, swapped=e.swapped, duplicate=e.duplicate)
+        if mapping_cache is not None:
+            result["mapping_cache"] = mapping_cache.stats()
 
     # Sanity checks
     assert result["correct"] + result["missed"] == result["gt_total"]
-    assert result["correct"] + result["misplaced"] == result["eval_total"]
+    eval_accounted = result["correct"] + result["misplaced"] + result.get("swapped", 0) + result.get("duplicate", 0)
+    assert eval_accounted == result["eval_total"]
 
     return result
 
 
+def evaluate_documents_streaming(
+    gt_path: Path,
+    eval_path: Path,
+    debug: bool = False,
+    mapping_cache: MappingCache | None = None,
+    budget: EvaluationBudget | None = None,
+    match: str = "position",
+    memory_limit: int | None = None,
+    grammar: TokenGrammar | None = None,
+) -> dict:
+    """Bounded-memory variant of evaluate_documents.
+
+    Both documents are streamed in lockstep one table at a time; each table pair is
+    evaluated and released, keeping only running totals (and per-cell details when
+    ``debug``). Peak memory per stage is reported under ``result["memory"]``.
+    """
+    totals = _empty_totals()
+    evaluations: list[CellEvaluation] = []
+    deadline = _document_deadline(budget)
+    with MemoryTracker(limit_bytes=memory_limit) as tracker:
+        gt_tables = iter_table_cell_texts(gt_path)
+        ev_tables = iter_table_cell_texts(eval_path)
+        while True:
+            with tracker.stage("extract_gt"):
+                gt_table = next(gt_tables, None)
+            with tracker.stage("extract_eval"):
+                ev_table = next(ev_tables, None)
+            if gt_table is None and ev_table is None:
+                break
+            with tracker.stage("evaluate"):
+                table_evaluations, table_totals = _evaluate_tables(
+                    gt_table or [],
+                    ev_table or [],
+                    debug,
+                    mapping_cache,
+                    "serial",
+                    None,
+                    budget=budget,
+                    match=match,
+                    deadline=deadline,
+                    grammar=grammar,
+                )
+                _merge_totals(totals, table_totals)
+                if debug:
+                    evaluations.extend(table_evaluations)
+                del gt_table, ev_table, table_evaluations
+        result = _build_result(evaluations, totals, debug, match, mapping_cache, grammar)
+        result["memory"] = tracker.summary()
+    return result
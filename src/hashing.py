@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+
+def content_hash(path: Path) -> str:
+    """SHA-256 hex digest of a file's bytes, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
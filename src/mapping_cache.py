@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Version 2: JSON instead of pickle, so loading a shared file never runs code
+_FORMAT_VERSION = 2
+# Rough per-entry cost: key digest + tuples + OrderedDict node; positions add 2 ints each
+_ENTRY_OVERHEAD_BYTES = 200
+_BYTES_PER_POSITION = 64
+
+_Key = tuple[bytes, tuple[int, ...]]
+
+
+def _text_pair_digest(gt_base: str, eval_base: str) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    gt_bytes = gt_base.encode("utf-8", "surrogatepass")
+    h.update(len(gt_bytes).to_bytes(8, "little"))
+    h.update(gt_bytes)
+    h.update(eval_base.encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+def _entry_size(positions: tuple[int, ...]) -> int:
+    return _ENTRY_OVERHEAD_BYTES + _BYTES_PER_POSITION * len(positions)
+
+
+def _is_int_list(value) -> bool:
+    return isinstance(value, list) and all(type(v) is int for v in value)
+
+
+def _parse_entries(raw) -> list[tuple[_Key, list[int]]] | None:
+    # [[digest hex, gt positions, mapped positions], ...]; None if anything is malformed
+    if not isinstance(raw, list):
+        return None
+    entries = []
+    for item in raw:
+        if not (isinstance(item, list) and len(item) == 3 and isinstance(item[0], str)):
+            return None
+        digest_hex, positions, mapped = item
+        if not (_is_int_list(positions) and _is_int_list(mapped) and len(positions) == len(mapped)):
+            return None
+        try:
+            digest = bytes.fromhex(digest_hex)
+        except ValueError:
+            return None
+        if len(digest) != 16:
+            return None
+        entries.append(((digest, tuple(positions)), mapped))
+    return entries
+
+
+class MappingCache:
+    """Bounded LRU memo of _map_positions results, optionally persisted to disk.
+
+    Keys are a blake2b digest of both base texts plus the GT position tuple, so
+    repeated template text maps once per run (or once ever, with ``path``). Thread
+    pools give each task a fork() and merge() it back afterwards, so workers never
+    contend on one lock.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, path: Path | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: OrderedDict[_Key, tuple[int, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Set on forks: read-only fallback for lookups, never locked or mutated
+        self._parent: MappingCache | None = None
+        if path is not None and path.exists():
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, gt_base: str, eval_base: str, gt_positions: list[int]) -> _Key:
+        return (_text_pair_digest(gt_base, eval_base), tuple(gt_positions))
+
+    def get(self, key: _Key) -> list[int] | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            elif self._parent is not None:
+                value = self._parent._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(value)
+
+    def put(self, key: _Key, mapped: list[int]) -> None:
+        size = _entry_size(key[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = tuple(mapped)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= _entry_size(old_key[1])
+                self.evictions += 1
+
+    def fork(self, max_bytes: int | None = None) -> MappingCache:
+        """Private cache for one worker task that reads through to this one.
+
+        This cache must not be written to until every fork has been merged back.
+        """
+        child = MappingCache(max_bytes=self.max_bytes if max_bytes is None else max_bytes)
+        child._parent = self
+        return child
+
+    def merge(self, other: MappingCache) -> None:
+        # Adopt a fork's new entries and counters once its task is done
+        for key, mapped in other._entries.items():
+            self.put(key, list(mapped))
+        with self._lock:
+            self.hits += other.hits
+            self.misses += other.misses
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def load(self, path: Path) -> None:
+        # A corrupt or foreign cache file only costs a cold start: nothing is loaded
+        # unless the whole payload has the expected shape
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, UnicodeDecodeError, ValueError):
+            return
+        if not isinstance(payload, dict) or payload.get("version") != _FORMAT_VERSION:
+            return
+        entries = _parse_entries(payload.get("entries"))
+        if entries is None:
+            return
+        for key, mapped in entries:
+            self.put(key, mapped)
+
+    def save(self, path: Path | None = None) -> None:
+        target = path or self.path
+        if target is None:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        payload = {
+            "version": _FORMAT_VERSION,
+            "entries": [[digest.hex(), list(positions), list(mapped)] for (digest, positions), mapped in entries],
+        }
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        # Atomic replace so concurrent runs never read a partial file
+        os.replace(tmp, target)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+_SIZE_REGEX = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like ``512M``, ``2GiB`` or ``1048576`` into bytes."""
+    m = _SIZE_REGEX.match(text)
+    if not m:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).lower()])
+
+
+def current_rss_bytes() -> int | None:
+    # Resident set size right now; Linux only (falls back to None elsewhere)
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def max_rss_bytes() -> int | None:
+    # Process lifetime peak; ru_maxrss is KiB on Linux and bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryTracker:
+    """Per-stage peak memory via tracemalloc, plus RSS sampled at stage boundaries.
+
+    Boundary samples miss spikes inside a stage, so the limit check uses the
+    process-lifetime ``ru_maxrss`` peak whenever it is available.
+    """
+
+    def __init__(self, limit_bytes: int | None = None) -> None:
+        self.limit_bytes = limit_bytes
+        self.stages: dict[str, dict] = {}
+        self.peak_rss_bytes = current_rss_bytes() or 0
+        self._started_tracing = False
+
+    def __enter__(self) -> MemoryTracker:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            rss = current_rss_bytes() or 0
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+            entry = self.stages.setdefault(name, {"calls": 0, "traced_peak_bytes": 0, "rss_peak_bytes": 0})
+            entry["calls"] += 1
+            entry["traced_peak_bytes"] = max(entry["traced_peak_bytes"], traced_peak)
+            entry["rss_peak_bytes"] = max(entry["rss_peak_bytes"], rss)
+
+    def summary(self) -> dict:
+        summary = {
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "max_rss_bytes": max_rss_bytes(),
+            "stages": self.stages,
+        }
+        if self.limit_bytes is not None:
+            summary["limit_bytes"] = self.limit_bytes
+            observed = max(self.peak_rss_bytes, summary["max_rss_bytes"] or 0)
+            summary["within_limit"] = observed <= self.limit_bytes
+        return summary
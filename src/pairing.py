@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+
+# Characters allowed between a GT stem and an eval-specific suffix, e.g.
+# ``report.docx`` (GT) <- ``report__model-a.docx`` / ``report.v2.docx`` (eval)
+_SUFFIX_SEPARATORS = "_-. "
+
+
+def is_docx_candidate(path: Path) -> bool:
+    # Skip Word lock files and hidden/temporary files
+    name = path.name
+    if name.startswith(("~$", ".")):
+        return False
+    return path.suffix.lower() == ".docx"
+
+
+def list_docx(directory: Path) -> list[Path]:
+    return sorted(p for p in directory.iterdir() if p.is_file() and is_docx_candidate(p))
+
+
+def match_gt_stem(eval_stem: str, gt_stems: Iterable[str]) -> str | None:
+    # Exact stem match first, then the longest GT stem that prefixes the eval
+    # stem and is followed by a separator character.
+    stems = gt_stems if isinstance(gt_stems, (set, frozenset, dict)) else set(gt_stems)
+    if eval_stem in stems:
+        return eval_stem
+    for cut in range(len(eval_stem) - 1, 0, -1):
+        if eval_stem[cut] in _SUFFIX_SEPARATORS and eval_stem[:cut] in stems:
+            return eval_stem[:cut]
+    return None
+
+
+def find_gt_for_eval(eval_path: Path, gt_dir: Path) -> Path | None:
+    gt_by_stem = {p.stem: p for p in list_docx(gt_dir)}
+    stem = match_gt_stem(eval_path.stem, gt_by_stem)
+    return gt_by_stem[stem] if stem is not None else None
+
+
+def pair_directories(gt_dir: Path, eval_dir: Path) -> list[tuple[Path, Path]]:
+    # Return (gt_path, eval_path) pairs; eval files without a GT are skipped
+    gt_by_stem = {p.stem: p for p in list_docx(gt_dir)}
+    pairs: list[tuple[Path, Path]] = []
+    for eval_path in list_docx(eval_dir):
+        stem = match_gt_stem(eval_path.stem, gt_by_stem)
+        if stem is not None:
+            pairs.append((gt_by_stem[stem], eval_path))
+    return pairs
@@ -6,20 +6,193 @@ import json
 
 
 def format_report(result: dict, fmt: str) -> str:
+    if "candidates" in result:
+        return _format_comparison(result, fmt)
     fields = ["gt_total", "eval_total", "correct", "misplaced", "missed"]
+    # Identity-aware matching splits some of the misplaced eval tokens into these
+    fields += [k for k in ("swapped", "duplicate") if k in result]
+    # Only surfaced when the budget kicked in, so exact reports keep their shape
+    if result.get("degraded_cells"):
+        fields.append("degraded_cells")
+    # Token-free cells the prefilter never built; present only when it was enabled
+    if "skipped_cells" in result:
+        fields.append("skipped_cells")
+    # Which GT was scored, when it was looked up in a catalog rather than given
+    fields += [k for k in ("gt_path", "gt_match_score") if k in result]
+    # Number of documents behind an aggregate (watch mode)
+    if "documents" in result:
+        fields.append("documents")
+    memory = result.get("memory")
+    # Per-family counts, present only when several token families were evaluated
+    families = result.get("families")
     if fmt == "json":
-        return json.dumps({k: result[k] for k in fields}, indent=2)
+        payload = {k: result[k] for k in fields}
+        if families is not None:
+            payload["families"] = families
+        if memory is not None:
+            payload["memory"] = memory
+        return json.dumps(payload, indent=2)
     if fmt == "csv":
+        row = {k: result[k] for k in fields}
+        for family, counts in (families or {}).items():
+            for k, v in counts.items():
+                row[f"{family}_{k}"] = v
+        if memory is not None:
+            row["peak_rss_bytes"] = memory["peak_rss_bytes"]
+            for stage, stats in memory["stages"].items():
+                row[f"{stage}_traced_peak_bytes"] = stats["traced_peak_bytes"]
         buf = io.StringIO()
-        writer = csv.DictWriter(buf, fieldnames=fields)
+        writer = csv.DictWriter(buf, fieldnames=list(row))
         writer.writeheader()
-        writer.writerow({k: result[k] for k in fields})
+        writer.writerow(row)
         return buf.getvalue()
     if fmt == "md":
         lines = ["| field | value |", "|---|---|"]
         for k in fields:
             lines.append(f"| {k} | {result[k]} |")
+        if families is not None:
+            columns = [k for k in fields if k in next(iter(families.values()), {})]
+            lines += ["", "| family | " + " | ".join(columns) + " |", "|---" * (len(columns) + 1) + "|"]
+            for family, counts in families.items():
+                lines.append(f"| {family} | " + " | ".join(str(counts[k]) for k in columns) + " |")
+        if memory is not None:
+            lines += ["", f"Peak RSS: {memory['peak_rss_bytes']} bytes", ""]
+            lines += ["| stage | calls | traced peak (bytes) | RSS peak (bytes) |", "|---|---|---|---|"]
+            for stage, stats in memory["stages"].items():
+                lines.append(
+                    f"| {stage} | {stats['calls']} | {stats['traced_peak_bytes']} | {stats['rss_peak_bytes']} |"
+                )
         return "\n".join(lines) + "\n"
     raise ValueError(f"Unsupported format: {fmt}")
 
 
+def _format_comparison(result: dict, fmt: str) -> str:
+    # Leaderboard from compare_documents: one totals row per candidate, then the
+    # cells where candidates disagree with one column per candidate
+    candidates = result["candidates"]
+    fields = ["eval_total", "correct", "misplaced", "missed"]
+    fields += [k for k in ("swapped", "duplicate") if candidates and k in candidates[0]]
+    if any(c.get("degraded_cells") for c in candidates):
+        fields.append("degraded_cells")
+    cell_fields = ["correct", "missed", "misplaced"] + [k for k in ("swapped", "duplicate") if k in fields]
+    if fmt == "json":
+        payload = {
+            "gt_total": result["gt_total"],
+            "candidates": [{k: c[k] for k in ["candidate", "rank", *fields]} for c in candidates],
+            "disagreements": result["disagreements"],
+        }
+        if result.get("gt_path") is not None:
+            payload["gt_path"] = result["gt_path"]
+        return json.dumps(payload, indent=2)
+    if fmt == "csv":
+        # Long format: scope=total rows per candidate, scope=cell rows per disagreement
+        columns = ["scope", "candidate", "rank", "table", "row", "col", "gt_tokens", *fields]
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=columns, restval="")
+        writer.writeheader()
+        for c in candidates:
+            row = {k: c[k] for k in ["candidate", "rank", *fields]}
+            writer.writerow({"scope": "total", "gt_tokens": result["gt_total"], **row})
+        for cell in result["disagreements"]:
+            for name, outcome in cell["candidates"].items():
+                writer.writerow(
+                    {
+                        "scope": "cell",
+                        "candidate": name,
+                        **{k: cell[k] for k in ("table", "row", "col", "gt_tokens")},
+                        **outcome,
+                    }
+                )
+        return buf.getvalue()
+    if fmt == "md":
+        lines = [f"GT tokens: {result['gt_total']}", ""]
+        lines += ["| rank | candidate | " + " | ".join(fields) + " |", "|---" * (len(fields) + 2) + "|"]
+        for c in sorted(candidates, key=lambda c: c["rank"]):
+            lines.append(f"| {c['rank']} | {c['candidate']} | " + " | ".join(str(c[k]) for k in fields) + " |")
+        if result["disagreements"]:
+            names = [c["candidate"] for c in candidates]
+            lines += ["", "Disagreements (" + "/".join(cell_fields) + " per candidate):", ""]
+            lines += ["| table | row | col | gt tokens | " + " | ".join(names) + " |", "|---" * (len(names) + 4) + "|"]
+            for cell in result["disagreements"]:
+                where = [cell["table"], cell["row"], cell["col"], cell["gt_tokens"]]
+                outcomes = ["/".join(str(cell["candidates"][n][k]) for k in cell_fields) for n in names]
+                lines.append("| " + " | ".join(str(v) for v in where + outcomes) + " |")
+        return "\n".join(lines) + "\n"
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def format_estimate_report(result: dict, fmt: str) -> str:
+    summary = [
+        "documents_sampled",
+        "documents_total",
+        "cells_evaluated",
+        "cells_total",
+        "confidence",
+        "precision_reached",
+        "stopped_early",
+        "seed",
+    ]
+    columns = ["metric", "estimate", "low", "high", "half_width"]
+    rows = [{"metric": name, **{c: r[c] for c in columns[1:]}} for name, r in result["rates"].items()]
+    if fmt == "json":
+        return json.dumps(result, indent=2)
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+        return buf.getvalue()
+    if fmt == "md":
+        lines = ["| metric | estimate | low | high | ± |", "|---|---|---|---|---|"]
+        for row in rows:
+            vals = [row[c] for c in columns[1:]]
+            cells = ["n/a" if v is None else f"{v:.4f}" for v in vals]
+            lines.append(f"| {row['metric']} | " + " | ".join(cells) + " |")
+        lines += ["", "| field | value |", "|---|---|"]
+        for k in summary:
+            lines.append(f"| {k} | {result[k]} |")
+        return "\n".join(lines) + "\n"
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def format_run_diff(diff: dict, fmt: str) -> str:
+    kinds = ("regressions", "improvements", "changed")
+    outcome = ["correct", "missed", "misplaced", "swapped", "duplicate", "degraded"]
+    if fmt == "json":
+        return json.dumps(diff, indent=2)
+    if fmt == "csv":
+        # One row per changed cell; added/removed documents get a row without cell fields
+        columns = ["change", "document", "gt_path", "eval_path", "table", "row", "col"]
+        columns += [f"base_{k}" for k in outcome] + [f"new_{k}" for k in outcome]
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=columns, restval="")
+        writer.writeheader()
+        for kind in kinds:
+            for e in diff[kind]:
+                row = {"change": kind, **{k: e[k] for k in columns[1:7]}}
+                row.update({f"base_{k}": e["base"][k] for k in outcome})
+                row.update({f"new_{k}": e["new"][k] for k in outcome})
+                writer.writerow(row)
+        for kind in ("added", "removed"):
+            for e in diff[kind]:
+                writer.writerow({"change": kind, **e})
+        return buf.getvalue()
+    if fmt == "md":
+        lines = [f"{diff['base']} -> {diff['new']}", "", "| field | value |", "|---|---|"]
+        for k in ("documents_changed", "added", "removed", *kinds):
+            value = diff[k] if k == "documents_changed" else len(diff[k])
+            lines.append(f"| {k} | {value} |")
+        for kind in kinds:
+            if not diff[kind]:
+                continue
+            lines += ["", f"{kind.capitalize()} (correct/missed/misplaced, base -> new):", ""]
+            lines += ["| eval | table | row | col | base | new |", "|---|---|---|---|---|---|"]
+            for e in diff[kind]:
+                before, after = ("/".join(str(e[side][k]) for k in outcome[:3]) for side in ("base", "new"))
+                lines.append(f"| {e['eval_path']} | {e['table']} | {e['row']} | {e['col']} | {before} | {after} |")
+        for kind in ("added", "removed"):
+            if diff[kind]:
+                lines += ["", f"{kind.capitalize()} documents:", ""]
+                lines += [f"- {e['eval_path']}" for e in diff[kind]]
+        return "\n".join(lines) + "\n"
+    raise ValueError(f"Unsupported format: {fmt}")
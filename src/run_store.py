@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+from .hashing import content_hash
+
+# Documents are spread over this many buckets per run; each bucket keeps the XOR of
+# its documents' leaf hashes, so two runs are compared bucket by bucket and only
+# buckets (then documents, then cells) whose digests differ are ever read
+NUM_BUCKETS = 4096
+_OUTCOME_FIELDS = ("gt_tokens", "eval_tokens", "correct", "missed", "misplaced", "swapped", "duplicate", "degraded")
+_TOTAL_FIELDS = ("gt_total", "eval_total", "correct", "misplaced", "missed", "swapped", "duplicate")
+_EMPTY_DIGEST = bytes(16)
+
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.digest()
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+def _bucket(doc_key: str) -> int:
+    return int.from_bytes(_digest(doc_key.encode("utf-8"))[:4], "little") % NUM_BUCKETS
+
+
+def _leaf(doc_key: str, doc_digest: bytes) -> bytes:
+    return _digest(doc_key.encode("utf-8"), doc_digest)
+
+
+def document_key(gt_path: Path, eval_path: Path) -> str:
+    """GT content hash plus eval file name: stable across runs that re-score the same GT."""
+    return f"{content_hash(gt_path)[:32]}/{eval_path.name}"
+
+
+def _cell_rows(cells: list[dict]) -> list[tuple]:
+    # Cells without tokens on either side are all zeros and are not stored
+    rows = []
+    for c in cells:
+        if not c["gt_positions"] and not c["eval_positions"]:
+            continue
+        outcome = (
+            len(c["gt_positions"]),
+            len(c["eval_positions"]),
+            c["correct"],
+            c["missed"],
+            c["misplaced"],
+            c.get("swapped", 0),
+            c.get("duplicate", 0),
+            int(c["degraded"]),
+        )
+        rows.append((c["table"], c["row"], c["col"], *outcome))
+    rows.sort()
+    return rows
+
+
+def _score(outcome: dict) -> tuple[int, int]:
+    errors = outcome["missed"] + outcome["misplaced"] + outcome["swapped"] + outcome["duplicate"]
+    return (outcome["correct"], -errors)
+
+
+class RunStore:
+    """SQLite history of evaluation runs with per-document and per-cell outcomes.
+
+    Documents are keyed by document_key(). Each document stores a digest of its cell
+    outcomes, and each run a digest per bucket of documents, so diff() only reads the
+    buckets, documents and cells that actually changed between two runs.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                doc_key TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                gt_path TEXT NOT NULL,
+                eval_path TEXT NOT NULL,
+                eval_hash TEXT NOT NULL,
+                gt_total INTEGER NOT NULL,
+                eval_total INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                misplaced INTEGER NOT NULL,
+                missed INTEGER NOT NULL,
+                swapped INTEGER NOT NULL,
+                duplicate INTEGER NOT NULL,
+                digest BLOB NOT NULL,
+                PRIMARY KEY (run_id, doc_key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS documents_bucket ON documents (run_id, bucket);
+            CREATE TABLE IF NOT EXISTS cells (
+                run_id INTEGER NOT NULL,
+                doc_key TEXT NOT NULL,
+                table_index INTEGER NOT NULL,
+                row_index INTEGER NOT NULL,
+                col_index INTEGER NOT NULL,
+                gt_tokens INTEGER NOT NULL,
+                eval_tokens INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                missed INTEGER NOT NULL,
+                misplaced INTEGER NOT NULL,
+                swapped INTEGER NOT NULL,
+                duplicate INTEGER NOT NULL,
+                degraded INTEGER NOT NULL,
+                PRIMARY KEY (run_id, doc_key, table_index, row_index, col_index)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS buckets (
+                run_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                digest BLOB NOT NULL,
+                PRIMARY KEY (run_id, bucket)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def __enter__(self) -> RunStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def runs(self) -> list[str]:
+        return [r[0] for r in self._conn.execute("SELECT name FROM runs ORDER BY id")]
+
+    def _run_id(self, run: str, create: bool = False) -> int:
+        row = self._conn.execute("SELECT id FROM runs WHERE name = ?", (run,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            raise KeyError(run)
+        return self._conn.execute("INSERT INTO runs (name, created_at) VALUES (?, ?)", (run, time.time())).lastrowid
+
+    def record(self, run: str, gt_path: Path, eval_path: Path, result: dict) -> str:
+        """Store one document's result (evaluated with ``debug=True``) under ``run``.
+
+        Recording the same document again in the same run replaces it. Returns the
+        document key.
+        """
+        if "cells" not in result:
+            raise ValueError("Recording a run needs per-cell results; evaluate with debug=True")
+        doc_key = document_key(gt_path, eval_path)
+        bucket = _bucket(doc_key)
+        rows = _cell_rows(result["cells"])
+        doc_digest = _digest(*(repr(r).encode() for r in rows))
+        totals = [result.get(k, 0) for k in _TOTAL_FIELDS]
+        with self._conn:
+            run_id = self._run_id(run, create=True)
+            previous = self._conn.execute(
+                "SELECT digest FROM documents WHERE run_id = ? AND doc_key = ?", (run_id, doc_key)
+            ).fetchone()
+            row = self._conn.execute(
+                "SELECT digest FROM buckets WHERE run_id = ? AND bucket = ?", (run_id, bucket)
+            ).fetchone()
+            bucket_digest = row[0] if row is not None else _EMPTY_DIGEST
+            if previous is not None:
+                bucket_digest = _xor(bucket_digest, _leaf(doc_key, previous[0]))
+                self._conn.execute("DELETE FROM cells WHERE run_id = ? AND doc_key = ?", (run_id, doc_key))
+            bucket_digest = _xor(bucket_digest, _leaf(doc_key, doc_digest))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, doc_key, bucket, str(gt_path), str(eval_path), content_hash(eval_path), *totals, doc_digest),
+            )
+            self._conn.executemany(
+                "INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, doc_key, *r) for r in rows],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO buckets (run_id, bucket, digest) VALUES (?, ?, ?)",
+                (run_id, bucket, bucket_digest),
+            )
+        return doc_key
+
+    def _documents(self, run_id: int, bucket: int) -> dict[str, tuple]:
+        rows = self._conn.execute(
+            "SELECT doc_key, digest, gt_path, eval_path FROM documents WHERE run_id = ? AND bucket = ?",
+            (run_id, bucket),
+        )
+        return {r[0]: r[1:] for r in rows}
+
+    def _cells(self, run_id: int, doc_key: str) -> dict[tuple[int, int, int], dict]:
+        rows = self._conn.execute(
+            "SELECT table_index, row_index, col_index, " + ", ".join(_OUTCOME_FIELDS)
+            + " FROM cells WHERE run_id = ? AND doc_key = ?",
+            (run_id, doc_key),
+        )
+        return {tuple(r[:3]): dict(zip(_OUTCOME_FIELDS, r[3:])) for r in rows}
+
+    def diff(self, base: str, new: str) -> dict:
+        """Cells whose outcome differs between two runs, split into regressions and improvements.
+
+        A cell regresses when it has fewer correct tokens, or as many correct tokens
+        but more errors (missed, misplaced, swapped, duplicate). Other changes, such
+        as a cell becoming degraded, are listed as ``changed``.
+        """
+        base_id = self._run_id(base)
+        new_id = self._run_id(new)
+        digests: list[dict[int, bytes]] = [
+            dict(self._conn.execute("SELECT bucket, digest FROM buckets WHERE run_id = ?", (run_id,)))
+            for run_id in (base_id, new_id)
+        ]
+        changed_buckets = sorted(
+            b for b in set(digests[0]) | set(digests[1])
+            if digests[0].get(b, _EMPTY_DIGEST) != digests[1].get(b, _EMPTY_DIGEST)
+        )
+
+        result: dict = {
+            "base": base,
+            "new": new,
+            "buckets_changed": len(changed_buckets),
+            "documents_changed": 0,
+            "added": [],
+            "removed": [],
+            "regressions": [],
+            "improvements": [],
+            "changed": [],
+        }
+        empty = dict.fromkeys(_OUTCOME_FIELDS, 0)
+        for bucket in changed_buckets:
+            base_docs = self._documents(base_id, bucket)
+            new_docs = self._documents(new_id, bucket)
+            for doc_key in sorted(set(base_docs) | set(new_docs)):
+                before = base_docs.get(doc_key)
+                after = new_docs.get(doc_key)
+                if before is not None and after is not None and before[0] == after[0]:
+                    continue
+                result["documents_changed"] += 1
+                if before is None or after is None:
+                    gt_path, eval_path = (after or before)[1:]
+                    entry = {"document": doc_key, "gt_path": gt_path, "eval_path": eval_path}
+                    result["added" if before is None else "removed"].append(entry)
+                    continue
+                base_cells = self._cells(base_id, doc_key)
+                new_cells = self._cells(new_id, doc_key)
+                for cell in sorted(set(base_cells) | set(new_cells)):
+                    old = base_cells.get(cell, empty)
+                    cur = new_cells.get(cell, empty)
+                    if old == cur:
+                        continue
+                    if _score(cur) < _score(old):
+                        kind = "regressions"
+                    elif _score(cur) > _score(old):
+                        kind = "improvements"
+                    else:
+                        kind = "changed"
+                    result[kind].append(
+                        {
+                            "document": doc_key,
+                            "gt_path": after[1],
+                            "eval_path": after[2],
+                            "table": cell[0],
+                            "row": cell[1],
+                            "col": cell[2],
+                            "base": old,
+                            "new": cur,
+                        }
+                    )
+        return result
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+from typing import Sequence
+
+from .docx_utils import CellText, TokenGrammar, extract_table_cell_texts, find_tokens
+from .evaluator import EvaluationBudget, _document_deadline, _evaluate_cells
+from .mapping_cache import MappingCache
+
+_CellKey = tuple[int, int, int]
+
+
+@dataclass
+class _DocumentSample:
+    gt_total: int
+    eval_total: int
+    correct_estimate: float
+    cells_total: int
+    cells_evaluated: int
+
+
+def _stratum(gt_tokens: int, eval_tokens: int, text_len: int) -> tuple[int, int, int]:
+    # Cheap features only: token counts (capped) and a coarse log2 length bucket
+    return (min(gt_tokens, 4), min(eval_tokens, 4), min(text_len.bit_length() // 2, 8))
+
+
+def _sample_document(
+    gt_cells: list[CellText],
+    ev_cells: list[CellText],
+    cell_fraction: float,
+    rng: random.Random,
+    mapping_cache: MappingCache | None = None,
+    budget: EvaluationBudget | None = None,
+    grammar: TokenGrammar | None = None,
+) -> _DocumentSample:
+    key = lambda c: (c.table_index, c.row_index, c.col_index)
+    gt_index: dict[_CellKey, CellText] = {key(c): c for c in gt_cells}
+    ev_index: dict[_CellKey, CellText] = {key(c): c for c in ev_cells}
+    all_keys = sorted(set(gt_index) | set(ev_index))
+
+    gt_total = 0
+    eval_total = 0
+    strata: dict[tuple[int, int, int], list[_CellKey]] = {}
+    for k in all_keys:
+        gt_text = gt_index[k].text if k in gt_index else ""
+        ev_text = ev_index[k].text if k in ev_index else ""
+        n_gt = len(find_tokens(gt_text, grammar))
+        n_ev = len(find_tokens(ev_text, grammar))
+        gt_total += n_gt
+        eval_total += n_ev
+        if n_gt == 0 or n_ev == 0:
+            # Nothing can be correct here, so the cell is known exactly without evaluating it
+            continue
+        strata.setdefault(_stratum(n_gt, n_ev, len(gt_text)), []).append(k)
+
+    correct_estimate = 0.0
+    evaluated = 0
+    # One time budget for the whole document, shared by all of its strata
+    deadline = _document_deadline(budget)
+    for stratum_key in sorted(strata):
+        keys = strata[stratum_key]
+        n = min(len(keys), max(2, math.ceil(cell_fraction * len(keys))))
+        chosen = set(keys if n == len(keys) else rng.sample(keys, n))
+        _, totals = _evaluate_cells(
+            [gt_index[k] for k in keys if k in chosen],
+            [ev_index[k] for k in keys if k in chosen],
+            debug=False,
+            mapping_cache=mapping_cache,
+            budget=budget,
+            deadline=deadline,
+            grammar=grammar,
+        )
+        correct_estimate += totals["correct"] * len(keys) / n
+        evaluated += n
+
+    return _DocumentSample(
+        gt_total=gt_total,
+        eval_total=eval_total,
+        correct_estimate=correct_estimate,
+        cells_total=len(all_keys),
+        cells_evaluated=evaluated,
+    )
+
+
+def _ratio_interval(
+    numerators: Sequence[float],
+    denominators: Sequence[float],
+    z: float,
+    fpc: float,
+) -> dict:
+    # Ratio estimator over documents as primary sampling units (linearized variance)
+    total_den = sum(denominators)
+    if total_den == 0:
+        return {"estimate": None, "low": None, "high": None, "half_width": None}
+    ratio = sum(numerators) / total_den
+    n = len(numerators)
+    if n < 2 and fpc > 0:
+        # No variance estimate from a single document: report the point estimate only
+        return {"estimate": ratio, "low": None, "high": None, "half_width": None}
+    if n < 2:
+        half = 0.0
+    else:
+        mean_den = total_den / n
+        resid = [y - ratio * x for y, x in zip(numerators, denominators)]
+        s2 = sum(r * r for r in resid) / (n - 1)
+        half = z * math.sqrt(max(fpc, 0.0) * s2 / n) / mean_den
+    return {
+        "estimate": ratio,
+        "low": max(0.0, ratio - half),
+        "high": min(1.0, ratio + half),
+        "half_width": half,
+    }
+
+
+def _rates(samples: list[_DocumentSample], z: float, fpc: float) -> dict:
+    correct = [s.correct_estimate for s in samples]
+    gt = [s.gt_total for s in samples]
+    ev = [s.eval_total for s in samples]
+    correct_rate = _ratio_interval(correct, gt, z, fpc)
+    # missed = gt_total - correct and misplaced = eval_total - correct, so both are complements
+    missed_rate = _ratio_interval([g - c for g, c in zip(gt, correct)], gt, z, fpc)
+    misplaced_rate = _ratio_interval([e - c for e, c in zip(ev, correct)], ev, z, fpc)
+    return {"correct": correct_rate, "missed": missed_rate, "misplaced": misplaced_rate}
+
+
+def _precision_reached(rates: dict, precision: float) -> bool:
+    widths = [r["half_width"] for r in rates.values() if r["half_width"] is not None]
+    return bool(widths) and max(widths) <= precision
+
+
+def estimate_corpus(
+    pairs: Sequence[tuple[Path, Path]],
+    precision: float = 0.01,
+    confidence: float = 0.95,
+    seed: int = 0,
+    cell_fraction: float = 0.25,
+    min_documents: int = 5,
+    max_documents: int | None = None,
+    mapping_cache: MappingCache | None = None,
+    budget: EvaluationBudget | None = None,
+    grammar: TokenGrammar | None = None,
+) -> dict:
+    """Estimate correct/missed/misplaced rates over (gt, eval) pairs from a sample.
+
+    Documents are visited in a seeded random order. Inside each document, cells that
+    carry tokens on both sides are stratified by token counts and text length and
+    only a ``cell_fraction`` share of each stratum is evaluated. Sampling stops once
+    every rate's confidence half-width is at most ``precision`` (absolute), after at
+    least ``min_documents`` documents. gt/eval token totals are counted exactly.
+    """
+    if not 0 < cell_fraction <= 1:
+        raise ValueError(f"cell_fraction must be in (0, 1], got {cell_fraction}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be in (0, 1), got {confidence}")
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    order = list(range(len(pairs)))
+    random.Random(seed).shuffle(order)
+    if max_documents is not None:
+        order = order[:max_documents]
+
+    samples: list[_DocumentSample] = []
+    rates = _rates(samples, z, 1.0)
+    stopped_early = False
+    for visited, doc_idx in enumerate(order, start=1):
+        gt_path, eval_path = pairs[doc_idx]
+        doc_rng = random.Random(seed * 1_000_003 + doc_idx)
+        samples.append(
+            _sample_document(
+                extract_table_cell_texts(gt_path),
+                extract_table_cell_texts(eval_path),
+                cell_fraction,
+                doc_rng,
+                mapping_cache,
+                budget,
+                grammar,
+            )
+        )
+        # Finite population correction only holds when within-document counts are exact
+        fpc = 1.0 - visited / len(pairs) if cell_fraction >= 1 else 1.0
+        rates = _rates(samples, z, fpc)
+        if visited >= min_documents and visited < len(order) and _precision_reached(rates, precision):
+            stopped_early = True
+            break
+
+    return {
+        "documents_total": len(pairs),
+        "documents_sampled": len(samples),
+        "cells_total": sum(s.cells_total for s in samples),
+        "cells_evaluated": sum(s.cells_evaluated for s in samples),
+        "gt_total": sum(s.gt_total for s in samples),
+        "eval_total": sum(s.eval_total for s in samples),
+        "correct_estimate": sum(s.correct_estimate for s in samples),
+        "rates": rates,
+        "confidence": confidence,
+        "precision": precision,
+        "precision_reached": _precision_reached(rates, precision),
+        "stopped_early": stopped_early,
+        "seed": seed,
+    }
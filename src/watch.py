@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import os
+import select
+import sys
+import time
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from pathlib import Path
+
+from .docx_utils import CellText, TokenGrammar, extract_table_cell_texts
+from .evaluator import EvaluationBudget, evaluate_cell_texts, make_executor
+from .pairing import is_docx_candidate, match_gt_stem
+from .report import format_report
+
+TOTAL_FIELDS = ["gt_total", "eval_total", "correct", "misplaced", "missed", "degraded_cells"]
+
+# inotify(7) event bits we care about
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# With inotify active, still rescan now and then in case events were dropped
+_INOTIFY_RESCAN_SECONDS = 30.0
+# Per-document reports live here, so no eval file name can collide with the aggregate
+_DOCUMENTS_SUBDIR = "documents"
+
+Signature = tuple[int, int]  # (size, mtime_ns)
+
+
+class _InotifyWakeup:
+    # Minimal ctypes binding; events only wake the loop, the stat scan decides what changed
+    def __init__(self, directories: list[Path]) -> None:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        for directory in directories:
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(directory)), _WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return False
+        # Drain queued events; their content is not needed
+        while True:
+            try:
+                if not os.read(self._fd, 64 * 1024):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollWakeup:
+    def wait(self, timeout: float) -> bool:
+        time.sleep(max(0.0, timeout))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def _make_wakeup(directories: list[Path], use_inotify: bool):
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return _InotifyWakeup(directories)
+        except (OSError, AttributeError):
+            pass
+    return _PollWakeup()
+
+
+def _stat_docx(directory: Path) -> dict[Path, Signature]:
+    # One scandir pass; only (size, mtime_ns) per candidate file
+    sigs: dict[Path, Signature] = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            path = Path(entry.path)
+            if not is_docx_candidate(path):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            sigs[path] = (st.st_size, st.st_mtime_ns)
+    return sigs
+
+
+def _score_eval(
+    gt_cells: list[CellText],
+    eval_path: Path,
+    budget: EvaluationBudget | None,
+    grammar: TokenGrammar | None = None,
+) -> dict:
+    # Runs in a worker; GT cells arrive pre-extracted from the watcher's cache
+    ev_cells = extract_table_cell_texts(eval_path)
+    return evaluate_cell_texts(gt_cells, ev_cells, budget=budget, grammar=grammar)
+
+
+@dataclass
+class _Pending:
+    signature: Signature
+    stable_since: float
+
+
+@dataclass
+class _Job:
+    eval_sig: Signature
+    gt_path: Path
+    gt_sig: Signature
+
+
+class EvalDirectoryWatcher:
+    def __init__(
+        self,
+        gt_dir: Path,
+        eval_dir: Path,
+        out_dir: Path,
+        fmt: str = "json",
+        workers: int | None = None,
+        executor: str = "processes",
+        budget: EvaluationBudget | None = None,
+        settle_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+        grammar: TokenGrammar | None = None,
+    ) -> None:
+        self.gt_dir = gt_dir
+        self.eval_dir = eval_dir
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.workers = workers
+        if executor not in ("threads", "processes"):
+            raise ValueError(f"Unsupported executor for watch mode: {executor}")
+        self.executor = executor
+        self.budget = budget
+        self.grammar = grammar
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        # Eval files seen but not yet stable for settle_seconds
+        self._pending: dict[Path, _Pending] = {}
+        # (eval_sig, gt_path, gt_sig) each eval file was last scored (or submitted) with
+        self._scored: dict[Path, tuple[Signature, Path, Signature]] = {}
+        self._results: dict[Path, dict] = {}
+        self._gt_cache: dict[Path, tuple[Signature, list[CellText]]] = {}
+        self._gt_sigs: dict[Path, Signature] = {}
+        self._in_flight: dict[Future, tuple[Path, _Job]] = {}
+        # (eval_sig, gt_path, gt_sig) of jobs that failed; retried once any part changes
+        self._failed: dict[Path, tuple[Signature, Path, Signature]] = {}
+
+    def _forget(self, path: Path) -> bool:
+        # Drop everything known about an eval file, including its report on disk;
+        # True if it had a counted result
+        self._scored.pop(path, None)
+        self._failed.pop(path, None)
+        if self._results.pop(path, None) is None:
+            return False
+        self._report_path(path).unlink(missing_ok=True)
+        return True
+
+    def _report_path(self, eval_path: Path) -> Path:
+        return self.out_dir / _DOCUMENTS_SUBDIR / f"{eval_path.stem}.{self.fmt}"
+
+    def scan(self, now: float | None = None) -> list[tuple[Path, _Job]]:
+        """Stat both directories and return eval files that are settled and need scoring."""
+        now = time.monotonic() if now is None else now
+        self._gt_sigs = _stat_docx(self.gt_dir)
+        gt_by_stem = {p.stem: p for p in self._gt_sigs}
+        for gt_path in list(self._gt_cache):
+            if gt_path not in self._gt_sigs:
+                del self._gt_cache[gt_path]
+        eval_sigs = _stat_docx(self.eval_dir)
+
+        dropped = False
+        for path in set(self._results) | set(self._scored) | set(self._failed):
+            scored = self._scored.get(path)
+            # Eval file gone, or the GT it was scored against was deleted or renamed
+            if path not in eval_sigs or (scored is not None and scored[1] not in self._gt_sigs):
+                dropped |= self._forget(path)
+        for path in list(self._pending):
+            if path not in eval_sigs:
+                del self._pending[path]
+
+        ready: list[tuple[Path, _Job]] = []
+        for path, sig in sorted(eval_sigs.items()):
+            stem = match_gt_stem(path.stem, gt_by_stem)
+            if stem is None:
+                dropped |= self._forget(path)
+                self._pending.pop(path, None)
+                continue
+            gt_path = gt_by_stem[stem]
+            gt_sig = self._gt_sigs[gt_path]
+            key = (sig, gt_path, gt_sig)
+            if self._scored.get(path) == key or self._failed.get(path) == key:
+                self._pending.pop(path, None)
+                continue
+            self._failed.pop(path, None)
+            pending = self._pending.get(path)
+            if pending is None or pending.signature != sig:
+                # New or still being written: restart the debounce window
+                self._pending[path] = _Pending(signature=sig, stable_since=now)
+                if self.settle_seconds > 0:
+                    continue
+                pending = self._pending[path]
+            if now - pending.stable_since < self.settle_seconds:
+                continue
+            del self._pending[path]
+            ready.append((path, _Job(eval_sig=sig, gt_path=gt_path, gt_sig=gt_sig)))
+        if dropped:
+            self._write_aggregate()
+        return ready
+
+    def _gt_cells(self, gt_path: Path, gt_sig: Signature) -> list[CellText]:
+        cached = self._gt_cache.get(gt_path)
+        if cached is not None and cached[0] == gt_sig:
+            return cached[1]
+        cells = extract_table_cell_texts(gt_path)
+        self._gt_cache[gt_path] = (gt_sig, cells)
+        return cells
+
+    def aggregate(self) -> dict:
+        totals = {k: 0 for k in TOTAL_FIELDS}
+        for res in self._results.values():
+            for k in TOTAL_FIELDS:
+                totals[k] += res[k]
+        totals["documents"] = len(self._results)
+        return totals
+
+    def _record(self, eval_path: Path, result: dict) -> None:
+        self._results[eval_path] = result
+        report_path = self._report_path(eval_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(format_report(result, self.fmt), encoding="utf-8")
+        self._write_aggregate()
+
+    def _write_aggregate(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        target = self.out_dir / f"aggregate.{self.fmt}"
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(format_report(self.aggregate(), self.fmt), encoding="utf-8")
+        # Atomic replace so readers never see a half-written aggregate
+        os.replace(tmp, target)
+
+    def _submit(self, pool: Executor, path: Path, job: _Job) -> None:
+        try:
+            gt_cells = self._gt_cells(job.gt_path, job.gt_sig)
+        except Exception as exc:  # noqa: BLE001
+            print(f"Cannot read GT {job.gt_path}: {exc}", file=sys.stderr)
+            return
+        # Mark as scored up front so an unchanged file is not resubmitted while in flight
+        self._scored[path] = (job.eval_sig, job.gt_path, job.gt_sig)
+        future = pool.submit(_score_eval, gt_cells, path, self.budget, self.grammar)
+        self._in_flight[future] = (path, job)
+
+    def _collect(self) -> None:
+        for future in [f for f in self._in_flight if f.done()]:
+            path, job = self._in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001
+                # Typically a file that was still incomplete; retry once the eval file
+                # or its GT changes
+                print(f"Failed to evaluate {path}: {exc}", file=sys.stderr)
+                key = (job.eval_sig, job.gt_path, job.gt_sig)
+                if self._scored.get(path) == key:
+                    del self._scored[path]
+                    self._failed[path] = key
+                continue
+            if self._scored.get(path) == (job.eval_sig, job.gt_path, job.gt_sig):
+                self._record(path, result)
+
+    def run(self, max_cycles: int | None = None) -> dict:
+        """Watch until interrupted (or for max_cycles scan cycles) and return the aggregate."""
+        wakeup = _make_wakeup([self.eval_dir, self.gt_dir], self.use_inotify)
+        inotify = isinstance(wakeup, _InotifyWakeup)
+        self._write_aggregate()
+        cycles = 0
+        try:
+            with make_executor(self.executor, self.workers) as pool:
+                while max_cycles is None or cycles < max_cycles:
+                    cycles += 1
+                    for path, job in self.scan():
+                        self._submit(pool, path, job)
+                    self._collect()
+                    if max_cycles is not None and cycles >= max_cycles:
+                        break
+                    if self._pending or self._in_flight or not inotify:
+                        timeout = min(self.poll_interval, self.settle_seconds or self.poll_interval)
+                    else:
+                        timeout = _INOTIFY_RESCAN_SECONDS
+                    wakeup.wait(timeout)
+                # Drain outstanding work before returning
+                while self._in_flight:
+                    time.sleep(0.05)
+                    self._collect()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            wakeup.close()
+        return self.aggregate()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.docx_utils import CellText  # noqa: E402
+from src.evaluator import (  # noqa: E402
+    EvaluationBudget,
+    _evaluate_cells,
+    _map_positions,
+    _map_positions_fallback,
+    evaluate_cell_texts,
+)
+from src.report import format_report  # noqa: E402
+
+
+def _cell(row: int, text: str) -> CellText:
+    return CellText(0, row, 0, (row, 0, row, 0), text)
+
+
+def _noise(seed: int, n: int) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghij ") for _ in range(n))
+
+
+def test_pathological_cell_degrades_instead_of_hanging():
+    # 100k chars with almost no overlap: exact SequenceMatcher would take minutes
+    gt_text = _noise(1, 50_000) + " CELL_1 " + _noise(2, 50_000)
+    ev_text = _noise(3, 50_000) + " CELL_1 " + _noise(4, 50_000)
+    budget = EvaluationBudget(max_cell_work=1_000_000)
+
+    start = time.perf_counter()
+    evaluations, totals = _evaluate_cells([_cell(0, gt_text)], [_cell(0, ev_text)], debug=False, budget=budget)
+    assert time.perf_counter() - start < 5
+
+    assert evaluations[0].degraded
+    assert totals["degraded_cells"] == 1
+    assert totals["correct"] + totals["missed"] == totals["gt_total"] == 1
+    assert totals["correct"] + totals["misplaced"] == totals["eval_total"] == 1
+
+
+def test_small_cells_stay_exact_under_budget():
+    gt = [_cell(0, "a CELL_1 b"), _cell(1, "Lorem CELL_2 ipsum dolor")]
+    ev = [_cell(0, "a CELL_1 b"), _cell(1, "Lorem ipsum CELL_2 dolor")]
+    budget = EvaluationBudget(max_cell_work=1_000_000)
+    assert evaluate_cell_texts(gt, ev, budget=budget) == {**evaluate_cell_texts(gt, ev), "degraded_cells": 0}
+
+
+def test_fallback_is_exact_for_prefix_suffix_edits():
+    head = _noise(5, 20_000)
+    tail = _noise(6, 20_000)
+    gt = head + "middle" + tail
+    ev = head + "the middle part" + tail
+    positions = [100, len(head), len(head) + 6 + 500, len(gt)]
+    # Middle diff fits the budget, so it matches the exact mapping restricted to the middle
+    assert _map_positions_fallback(gt, ev, positions, max_work=10_000) == [100, len(head), len(head) + 15 + 500, len(ev)]
+
+
+def test_fallback_uses_unique_anchors_when_middle_is_too_big():
+    gt = _noise(7, 3000) + "UNIQUE-ANCHOR-TEXT" + _noise(8, 3000)
+    ev = "x" + _noise(9, 2000) + "UNIQUE-ANCHOR-TEXT" + _noise(10, 2000) + "y"
+    pos = 3000 + len("UNIQUE-ANCHOR-TEXT")
+    expected = _map_positions(gt, ev, [pos])
+    assert _map_positions_fallback(gt, ev, [pos], max_work=1) == expected
+
+
+def test_document_time_budget_degrades_remaining_cells():
+    gt = [_cell(r, f"row {r} CELL_{r} text") for r in range(5)]
+    ev = [_cell(r, f"row {r} text CELL_{r}") for r in range(5)]
+    budget = EvaluationBudget(max_document_seconds=0.0)
+    res = evaluate_cell_texts(gt, ev, debug=True, budget=budget)
+    assert res["degraded_cells"] == 5
+    assert all(c["degraded"] for c in res["cells"])
+    assert "degraded_cells" in format_report(res, "md")
+
+
+def test_document_time_budget_bounds_large_cells():
+    # Only the time budget is set: past the deadline a large low-overlap cell must
+    # not run the full middle diff the budget exists to avoid
+    gt_text = _noise(11, 8_000) + " CELL_1 " + _noise(12, 8_000)
+    ev_text = _noise(13, 8_000) + " CELL_1 " + _noise(14, 8_000)
+    budget = EvaluationBudget(max_document_seconds=0.0)
+
+    start = time.perf_counter()
+    evaluations, totals = _evaluate_cells([_cell(0, gt_text)], [_cell(0, ev_text)], debug=False, budget=budget)
+    assert time.perf_counter() - start < 1
+
+    assert evaluations[0].degraded
+    assert totals["correct"] + totals["missed"] == totals["gt_total"] == 1
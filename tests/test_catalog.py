@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.catalog import GroundTruthCatalog  # noqa: E402
+from src.cli import main as cli_main  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+TOPICS = [
+    "quarterly revenue by region and product line",
+    "employee onboarding checklist for new hires",
+    "laboratory sample storage temperatures and durations",
+    "city council meeting agenda and voting record",
+    "shipping manifest with container weights and ports",
+    "course syllabus with weekly reading assignments",
+]
+
+
+def _write(path: Path, topic: str, rows: int, token_at_end: bool = False) -> None:
+    doc = new_doc()
+    table = add_table(doc, rows, 2)
+    for r in range(rows):
+        set_cell_text(table.cell(r, 0), f"{topic} item {r} description text")
+        token = f"CELL_{r}"
+        text = f"value for {topic} row {r} {token}" if token_at_end else f"value for {token} {topic} row {r}"
+        set_cell_text(table.cell(r, 1), text)
+    save(doc, path)
+
+
+def _build(tmp: Path) -> tuple[list[Path], GroundTruthCatalog]:
+    gt_paths = []
+    for i, topic in enumerate(TOPICS):
+        path = tmp / "gt" / f"gt_{i}.docx"
+        _write(path, topic, rows=4 + i)
+        gt_paths.append(path)
+    catalog = GroundTruthCatalog(tmp / "catalog.db")
+    assert catalog.add_many(gt_paths) == len(TOPICS)
+    return gt_paths, catalog
+
+
+def test_resolves_renamed_eval_to_its_gt(tmp_path: Path):
+    gt_paths, catalog = _build(tmp_path)
+    with catalog:
+        for i, topic in enumerate(TOPICS):
+            ev = tmp_path / "ev" / f"export_{9 - i}.docx"
+            _write(ev, topic, rows=4 + i, token_at_end=True)
+            match = catalog.best_match(ev)
+            assert match is not None
+            assert match.path == gt_paths[i].resolve()
+            assert match.score > 0.5
+
+
+def test_incremental_updates(tmp_path: Path):
+    gt_paths, catalog = _build(tmp_path)
+    with catalog:
+        assert catalog.add(gt_paths[0]) is False  # unchanged content is skipped
+        _write(gt_paths[0], "completely different subject matter here", rows=3)
+        assert catalog.add(gt_paths[0]) is True
+        assert len(catalog) == len(TOPICS)
+
+        gt_paths[1].unlink()
+        assert catalog.prune() == 1
+        assert len(catalog) == len(TOPICS) - 1
+
+        ev = tmp_path / "ev.docx"
+        _write(ev, TOPICS[1], rows=5)
+        match = catalog.best_match(ev, min_score=0.5)
+        assert match is None
+
+
+def test_cli_resolves_gt_from_catalog(tmp_path: Path, capsys):
+    gt_dir = tmp_path / "gt"
+    for i, topic in enumerate(TOPICS):
+        _write(gt_dir / f"gt_{i}.docx", topic, rows=3)
+    db = tmp_path / "catalog.db"
+    cli_main(["catalog", "--catalog", str(db), str(gt_dir)])
+    assert "indexed 6" in capsys.readouterr().out
+
+    ev = tmp_path / "renamed.docx"
+    _write(ev, TOPICS[3], rows=3)
+    out = tmp_path / "report.json"
+    cli_main(["--gt-catalog", str(db), "--eval", str(ev), "--format", "json", "--out", str(out), "--debug"])
+    printed = json.loads(capsys.readouterr().out)
+    assert Path(printed["gt_path"]).name == "gt_3.docx"
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["correct"] == 3
+    assert Path(report["gt_path"]).name == "gt_3.docx"
+    assert report["gt_match_score"] == printed["gt_match_score"] > 0.5
+
+    for fmt in ("csv", "md"):
+        out = tmp_path / f"report.{fmt}"
+        cli_main(["--gt-catalog", str(db), "--eval", str(ev), "--format", fmt, "--out", str(out)])
+        text = out.read_text(encoding="utf-8")
+        assert "gt_3.docx" in text and "gt_match_score" in text
+
+
+def _write_fields(path: Path, topic: str, field_first: bool) -> None:
+    doc = new_doc()
+    table = add_table(doc, 4, 1)
+    for r in range(4):
+        words = f"{topic.split()[r]} {r}"
+        set_cell_text(table.cell(r, 0), f"{{{{f{r}}}}} {words}" if field_first else f"{words} {{{{f{r}}}}}")
+    save(doc, path)
+
+
+def test_cli_catalog_uses_token_patterns(tmp_path: Path, capsys):
+    gt_dir = tmp_path / "gt"
+    for i, topic in enumerate(TOPICS):
+        _write_fields(gt_dir / f"gt_{i}.docx", topic, field_first=True)
+    pattern = ["--token-pattern", r"field=\{\{\w+\}\}"]
+    db = tmp_path / "catalog.db"
+    cli_main(["catalog", "--catalog", str(db), str(gt_dir), *pattern])
+    capsys.readouterr()
+
+    # The field markers moved; only with them stripped do the cells still match
+    ev = tmp_path / "renamed.docx"
+    _write_fields(ev, TOPICS[2], field_first=False)
+    out = tmp_path / "report.json"
+    args = ["--gt-catalog", str(db), "--eval", str(ev), "--format", "json", "--out", str(out)]
+    with pytest.raises(SystemExit, match="No GT"):
+        cli_main(args)
+    cli_main([*args, *pattern])
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert Path(report["gt_path"]).name == "gt_2.docx"
+    assert report["gt_match_score"] == 1.0
+    assert report["gt_total"] == report["misplaced"] == 4
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cli import main  # noqa: E402
+from src.compare import compare_documents  # noqa: E402
+from src.evaluator import evaluate_documents  # noqa: E402
+from src.mapping_cache import MappingCache  # noqa: E402
+from src.report import format_report  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _doc(path: Path, cells: list[str]) -> Path:
+    doc = new_doc()
+    table = add_table(doc, len(cells), 1)
+    for r, text in enumerate(cells):
+        set_cell_text(table.cell(r, 0), text)
+    save(doc, path)
+    return path
+
+
+def _fixture(tmp_path: Path) -> tuple[Path, list[Path]]:
+    gt = _doc(tmp_path / "gt.docx", ["Name CELL_1 here", "Total CELL_2", "plain"])
+    perfect = _doc(tmp_path / "perfect.docx", ["Name CELL_1 here", "Total CELL_2", "plain"])
+    shifted = _doc(tmp_path / "shifted.docx", ["Name here CELL_1", "Total CELL_2", "plain"])
+    empty = _doc(tmp_path / "empty.docx", ["Name here", "Total", "plain"])
+    return gt, [shifted, perfect, empty]
+
+
+def test_candidates_match_individual_runs(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    result = compare_documents(gt, candidates)
+    for path, row in zip(candidates, result["candidates"]):
+        single = evaluate_documents(gt, path)
+        assert row["candidate"] == str(path)
+        assert {k: row[k] for k in single} == single
+    assert [c["rank"] for c in result["candidates"]] == [2, 1, 3]
+    assert result["gt_total"] == 2
+
+
+def test_disagreements_list_only_differing_cells(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    result = compare_documents(gt, candidates)
+    assert [(d["table"], d["row"], d["col"]) for d in result["disagreements"]] == [(0, 0, 0), (0, 1, 0)]
+    first = result["disagreements"][0]["candidates"]
+    assert first[str(candidates[0])] == {"correct": 0, "missed": 1, "misplaced": 1}
+    assert first[str(candidates[1])] == {"correct": 1, "missed": 0, "misplaced": 0}
+
+
+def test_identical_candidates_scored_once(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    copy = tmp_path / "shifted_copy.docx"
+    shutil.copy(candidates[0], copy)
+    cache = MappingCache()
+    result = compare_documents(gt, [candidates[0], copy], mapping_cache=cache)
+    # Only one diff was needed: the copy reuses the first candidate's evaluation
+    assert cache.stats()["misses"] == 1
+    assert result["candidates"][0]["correct"] == result["candidates"][1]["correct"]
+    assert result["disagreements"] == []
+
+
+def test_threads_match_serial(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    assert compare_documents(gt, candidates, executor="threads", max_workers=2) == compare_documents(gt, candidates)
+
+
+def test_cli_compare_reports(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    out = tmp_path / "board.json"
+    main(["compare", "--gt", str(gt), "--eval", *map(str, candidates), "--format", "json", "--out", str(out)])
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["gt_path"] == str(gt)
+    assert [c["rank"] for c in report["candidates"]] == [2, 1, 3]
+
+    rows = list(csv.DictReader(io.StringIO(format_report(report, "csv"))))
+    assert [r["scope"] for r in rows] == ["total"] * 3 + ["cell"] * 6
+    md = format_report(report, "md")
+    assert "| 1 | " + str(candidates[1]) in md
+    assert "Disagreements" in md
+
+
+def test_compare_does_not_load_catalog():
+    import subprocess
+
+    code = "import sys, src.compare; assert 'src.catalog' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[1])
+
+
+def test_cli_compare_rejects_bad_candidate_before_touching_out(tmp_path):
+    gt, candidates = _fixture(tmp_path)
+    out = tmp_path / "board.json"
+    out.write_text("previous", encoding="utf-8")
+    missing = tmp_path / "missing.docx"
+    with pytest.raises(SystemExit, match="Invalid --eval path"):
+        main(["compare", "--gt", str(gt), "--eval", str(candidates[0]), str(missing), "--format", "json", "--out", str(out)])
+    assert out.read_text(encoding="utf-8") == "previous"
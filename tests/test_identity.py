@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.docx_utils import CellText, strip_tokens_with_ids  # noqa: E402
+from src.evaluator import evaluate_cell_texts, evaluate_documents  # noqa: E402
+from src.report import format_report  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _row(texts: list[str]) -> list[CellText]:
+    return [CellText(0, 0, c, (0, c, 0, c), t) for c, t in enumerate(texts)]
+
+
+def test_strip_tokens_keeps_normalized_ids():
+    assert strip_tokens_with_ids("a cell_7 b CeLl_12") == ("a  b ", [(2, "CELL_7"), (5, "CELL_12")])
+
+
+def test_swapped_tokens_in_same_cell():
+    gt = _row(["a CELL_1 b CELL_2 c"])
+    ev = _row(["a CELL_2 b CELL_1 c"])
+    assert evaluate_cell_texts(gt, ev)["correct"] == 2
+    res = evaluate_cell_texts(gt, ev, match="identity")
+    assert res["correct"] == 0
+    assert res["swapped"] == 2
+    assert res["missed"] == 2
+    assert res["misplaced"] == 0
+
+
+def test_swapped_tokens_across_cells():
+    res = evaluate_cell_texts(_row(["CELL_1", "CELL_2"]), _row(["CELL_2", "CELL_1"]), match="identity", debug=True)
+    assert (res["correct"], res["swapped"], res["missed"]) == (0, 2, 2)
+    assert res["cells"][0]["gt_ids"] == ["CELL_1"]
+    assert res["cells"][0]["eval_ids"] == ["CELL_2"]
+
+
+def test_extra_token_next_to_matched_one_is_misplaced():
+    # CELL_1 is matched at the slot, so nothing there is left for CELL_2 to swap with
+    res = evaluate_cell_texts(_row(["a CELL_1 b"]), _row(["a CELL_1CELL_2 b"]), match="identity")
+    assert (res["correct"], res["swapped"], res["misplaced"], res["missed"]) == (1, 0, 1, 0)
+
+
+def test_duplicates_and_misplaced():
+    gt = _row(["x CELL_1 y", "p CELL_2 q"])
+    ev = _row(["x cell_1 y CELL_1", "p q CELL_2"])
+    res = evaluate_cell_texts(gt, ev, match="identity")
+    assert res["correct"] == 1
+    assert res["duplicate"] == 1
+    assert res["misplaced"] == 1
+    assert res["missed"] == 1
+    md = format_report(res, "md")
+    assert "| swapped | 0 |" in md
+    assert "| duplicate | 1 |" in md
+
+
+def test_join_is_linear_on_large_tables():
+    n = 5000
+    gt = [CellText(0, r, 0, (r, 0, r, 0), f"row {r} CELL_{r}") for r in range(n)]
+    ev = [CellText(0, r, 0, (r, 0, r, 0), f"row {r} CELL_{(r + 1) % n}") for r in range(n)]
+    start = time.perf_counter()
+    res = evaluate_cell_texts(gt, ev, match="identity")
+    assert time.perf_counter() - start < 5
+    assert res["swapped"] == n
+    assert res["correct"] == 0
+
+
+def test_identity_matches_position_mode_when_ids_agree(tmp_path: Path):
+    gt = new_doc()
+    ev = new_doc()
+    t1 = add_table(gt, 1, 2)
+    t2 = add_table(ev, 1, 2)
+    set_cell_text(t1.cell(0, 0), "Lorem CELL_1 ipsum")
+    set_cell_text(t1.cell(0, 1), "dolor CELL_2 sit")
+    set_cell_text(t2.cell(0, 0), "Lorem cell_1 ipsum")
+    set_cell_text(t2.cell(0, 1), "dolor sit CELL_2")
+    p_gt, p_ev = tmp_path / "id_gt.docx", tmp_path / "id_ev.docx"
+    save(gt, p_gt)
+    save(ev, p_ev)
+
+    positional = evaluate_documents(p_gt, p_ev)
+    identity = evaluate_documents(p_gt, p_ev, match="identity")
+    for k in ("gt_total", "eval_total", "correct", "missed", "misplaced"):
+        assert identity[k] == positional[k]
+    assert identity["swapped"] == identity["duplicate"] == 0
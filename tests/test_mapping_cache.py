@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.docx_utils import CellText  # noqa: E402
+from src.evaluator import _evaluate_cells, evaluate_cell_texts  # noqa: E402
+from src.mapping_cache import MappingCache  # noqa: E402
+
+
+def _cells(texts: list[str]) -> list[CellText]:
+    return [CellText(0, r, 0, (r, 0, r, 0), t) for r, t in enumerate(texts)]
+
+
+def test_repeated_template_text_hits_cache():
+    gt = _cells(["Total CELL_1 amount due"] * 50)
+    ev = _cells(["Total amount CELL_9 due"] * 50)
+    cache = MappingCache()
+    _, cached = _evaluate_cells(gt, ev, debug=False, mapping_cache=cache)
+    _, plain = _evaluate_cells(gt, ev, debug=False)
+    assert cached == plain
+    assert cache.misses == 1
+    assert cache.hits == 49
+    assert len(cache) == 1
+
+
+def test_identical_text_bypasses_cache():
+    cache = MappingCache()
+    _evaluate_cells(_cells(["a CELL_1 b"]), _cells(["a CELL_2 b"]), debug=False, mapping_cache=cache)
+    assert cache.hits == cache.misses == 0
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = MappingCache(max_bytes=1000)
+    for i in range(50):
+        cache.put(cache.key(f"gt {i}", f"ev {i}", [0]), [1])
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.evictions > 0
+    # Most recent entry survives, the oldest is gone
+    assert cache.get(cache.key("gt 49", "ev 49", [0])) == [1]
+    assert cache.get(cache.key("gt 0", "ev 0", [0])) is None
+
+
+def test_persisted_cache_is_shared_between_runs(tmp_path: Path):
+    path = tmp_path / "mapping.cache"
+    gt = _cells(["header CELL_1 footer"])
+    ev = _cells(["header footer CELL_1"])
+    first = MappingCache(path=path)
+    evaluate_cell_texts(gt, ev, mapping_cache=first)
+    first.save()
+
+    second = MappingCache(path=path)
+    res = evaluate_cell_texts(gt, ev, debug=True, mapping_cache=second)
+    assert res["mapping_cache"]["hits"] == 1
+    assert res["mapping_cache"]["misses"] == 0
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path: Path):
+    path = tmp_path / "mapping.cache"
+    path.write_bytes(b"not json")
+    assert len(MappingCache(path=path)) == 0
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"version": 2},
+        {"version": 2, "entries": {}},
+        {"version": 2, "entries": [["00" * 16, [1, 2]]]},
+        {"version": 2, "entries": [["zz", [1], [1]]]},
+        {"version": 2, "entries": [["00" * 16, [1, 2], [3]]]},
+        {"version": 2, "entries": [["00" * 16, ["1"], [3]]]},
+        {"version": 1, "entries": []},
+        [1, 2, 3],
+    ],
+)
+def test_malformed_cache_payload_is_ignored(tmp_path: Path, payload):
+    path = tmp_path / "mapping.cache"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    assert len(MappingCache(path=path)) == 0
+
+
+def test_pickle_files_are_never_unpickled(tmp_path: Path):
+    path = tmp_path / "mapping.cache"
+    path.write_bytes(pickle.dumps({"version": 1, "entries": []}))
+    assert len(MappingCache(path=path)) == 0
+
+
+def test_forks_read_through_and_merge_back():
+    cache = MappingCache()
+    shared = cache.key("gt a", "ev a", [0])
+    cache.put(shared, [1])
+    fork = cache.fork()
+    assert fork.get(shared) == [1]
+    fork.put(fork.key("gt b", "ev b", [0]), [2])
+    # The parent is untouched until the fork is merged
+    assert len(cache) == 1 and cache.hits == 0
+    cache.merge(fork)
+    assert cache.get(cache.key("gt b", "ev b", [0])) == [2]
+    assert cache.hits == 2
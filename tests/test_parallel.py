@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.evaluator import evaluate_document_pairs, evaluate_documents  # noqa: E402
+from src.mapping_cache import MappingCache  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+
+
+def _make_pair(tmp: Path, idx: int) -> tuple[Path, Path]:
+    gt = new_doc()
+    ev = new_doc()
+    for t in range(3):
+        t1 = add_table(gt, 4, 3)
+        t2 = add_table(ev, 4, 3)
+        for r in range(4):
+            for c in range(3):
+                n = idx * 100 + t * 10 + r * 3 + c
+                set_cell_text(t1.cell(r, c), f"{LOREM}CELL_{n} {LOREM}")
+                if (n + idx) % 4 == 0:
+                    ev_text = f"{LOREM}{LOREM}CELL_{n}"  # moved
+                elif (n + idx) % 7 == 0:
+                    ev_text = f"{LOREM}{LOREM}"  # dropped
+                else:
+                    ev_text = f"{LOREM}cell_{n} {LOREM}"
+                set_cell_text(t2.cell(r, c), ev_text)
+    p_gt, p_ev = tmp / f"p{idx}_gt.docx", tmp / f"p{idx}_ev.docx"
+    save(gt, p_gt)
+    save(ev, p_ev)
+    return p_gt, p_ev
+
+
+def test_threaded_documents_match_serial(tmp_path: Path):
+    pairs = [_make_pair(tmp_path, i) for i in range(6)]
+    serial = evaluate_document_pairs(pairs, debug=True, executor="serial")
+    for _ in range(5):
+        shared_cache = MappingCache()
+        threaded = evaluate_document_pairs(
+            pairs * 3, debug=True, executor="threads", max_workers=8, mapping_cache=shared_cache
+        )
+        for i, res in enumerate(threaded):
+            expected = serial[i % len(pairs)]
+            res.pop("mapping_cache", None)
+            assert res == expected
+        stats = shared_cache.stats()
+        assert stats["hits"] + stats["misses"] > 0
+
+
+def test_threaded_tables_match_serial(tmp_path: Path):
+    gt_p, ev_p = _make_pair(tmp_path, 1)
+    serial = evaluate_documents(gt_p, ev_p, debug=True)
+    for _ in range(10):
+        assert evaluate_documents(gt_p, ev_p, debug=True, executor="threads", max_workers=4) == serial
+
+
+def test_process_pool_matches_serial(tmp_path: Path):
+    pairs = [_make_pair(tmp_path, i) for i in range(3)]
+    serial = evaluate_document_pairs(pairs, executor="serial")
+    assert evaluate_document_pairs(pairs, executor="processes", max_workers=2) == serial
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.docx_utils import TokenGrammar, extract_token_cell_texts  # noqa: E402
+from src.evaluator import evaluate_documents  # noqa: E402
+from src.report import format_report  # noqa: E402
+from tests.helpers import add_runs, add_table, merge, new_doc, save, set_cell_text  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures" / "generated"
+
+
+def _without_skipped(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k != "skipped_cells"}
+
+
+@pytest.mark.parametrize("scenario", sorted(p.name for p in FIXTURES.iterdir() if (p / "gt.docx").exists()))
+@pytest.mark.parametrize("match", ["position", "identity"])
+def test_totals_unchanged_on_fixtures(scenario, match):
+    gt, ev = FIXTURES / scenario / "gt.docx", FIXTURES / scenario / "eval.docx"
+    filtered = evaluate_documents(gt, ev, match=match, prefilter=True)
+    assert _without_skipped(filtered) == evaluate_documents(gt, ev, match=match)
+
+
+def _sparse_pair(tmp_path: Path) -> tuple[Path, Path]:
+    gt = new_doc()
+    ev = new_doc()
+    t_gt = add_table(gt, 4, 3)
+    t_ev = add_table(ev, 4, 3)
+    for r in range(4):
+        for c in range(3):
+            set_cell_text(t_gt.cell(r, c), f"header {r}.{c}")
+            set_cell_text(t_ev.cell(r, c), f"header {r}.{c}")
+    # Token split across runs on the GT side only
+    add_runs(t_gt.cell(1, 1), ["value CE", "LL_", "7 end"])
+    set_cell_text(t_ev.cell(1, 1), "value end")
+    # Token only on the eval side
+    set_cell_text(t_ev.cell(2, 0), "CELL_8 header 2.0")
+    # A merged table on one side falls back to full extraction
+    m_gt = add_table(gt, 2, 2)
+    m_ev = add_table(ev, 2, 2)
+    merge(m_gt, 0, 0, 0, 1)
+    set_cell_text(m_gt.cell(0, 0), "CELL_9 merged")
+    set_cell_text(m_ev.cell(0, 1), "CELL_9 merged")
+    save(gt, tmp_path / "gt.docx")
+    save(ev, tmp_path / "ev.docx")
+    return tmp_path / "gt.docx", tmp_path / "ev.docx"
+
+
+def test_only_token_cells_are_built(tmp_path):
+    gt, ev = _sparse_pair(tmp_path)
+    gt_cells, ev_cells, skipped = extract_token_cell_texts(gt, ev)
+    plain_gt = [(c.row_index, c.col_index, c.text) for c in gt_cells if c.table_index == 0]
+    assert plain_gt == [(1, 1, "value CELL_7 end"), (2, 0, "header 2.0")]
+    assert skipped == 10
+    # Merged table: every cell of both sides is kept
+    assert len([c for c in gt_cells if c.table_index == 1]) == 3
+    assert len([c for c in ev_cells if c.table_index == 1]) == 4
+
+
+def test_sparse_totals_and_report(tmp_path):
+    gt, ev = _sparse_pair(tmp_path)
+    filtered = evaluate_documents(gt, ev, prefilter=True)
+    assert _without_skipped(filtered) == evaluate_documents(gt, ev)
+    assert filtered["skipped_cells"] == 10
+    assert "skipped_cells" in format_report(filtered, "csv")
+    # Debug output lists every cell, so the prefilter stays off
+    assert "skipped_cells" not in evaluate_documents(gt, ev, prefilter=True, debug=True)
+
+
+def test_custom_grammar_drives_the_filter(tmp_path):
+    gt, ev = _sparse_pair(tmp_path)
+    grammar = TokenGrammar({"header": r"header \d\.\d"})
+    _, _, skipped = extract_token_cell_texts(gt, ev, grammar)
+    # Only the "value ... end" cell has no header text on either side
+    assert skipped == 1
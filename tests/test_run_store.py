@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cli import main  # noqa: E402
+from src.evaluator import evaluate_documents  # noqa: E402
+from src.report import format_run_diff  # noqa: E402
+from src.run_store import RunStore  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _doc(path: Path, cells: list[str]) -> Path:
+    doc = new_doc()
+    table = add_table(doc, len(cells), 1)
+    for r, text in enumerate(cells):
+        set_cell_text(table.cell(r, 0), text)
+    save(doc, path)
+    return path
+
+
+def _corpus(root: Path, n: int) -> list[tuple[Path, Path]]:
+    pairs = []
+    for i in range(n):
+        gt = _doc(root / "gt" / f"doc{i}.docx", [f"Name CELL_{i} here", f"Total {i} CELL_{i + 100}", "plain"])
+        ev = _doc(root / "ev" / f"doc{i}.docx", [f"Name CELL_{i} here", f"Total {i} CELL_{i + 100}", "plain"])
+        pairs.append((gt, ev))
+    return pairs
+
+
+def _record(store: RunStore, run: str, pairs: list[tuple[Path, Path]]) -> None:
+    for gt, ev in pairs:
+        store.record(run, gt, ev, evaluate_documents(gt, ev, debug=True))
+
+
+def test_diff_lists_only_changed_cells(tmp_path):
+    pairs = _corpus(tmp_path / "r1", 20)
+    with RunStore(tmp_path / "runs.db") as store:
+        _record(store, "v1", pairs)
+        # The next release moves one token and fixes nothing else
+        gt, ev = pairs[3]
+        _doc(ev, ["Name here CELL_3", "Total 3 CELL_103", "plain"])
+        _record(store, "v2", pairs)
+        diff = store.diff("v1", "v2")
+        assert diff["documents_changed"] == 1
+        assert diff["buckets_changed"] == 1
+        assert [(d["eval_path"], d["row"]) for d in diff["regressions"]] == [(str(ev), 0)]
+        assert diff["regressions"][0]["base"]["correct"] == 1
+        assert diff["regressions"][0]["new"]["correct"] == 0
+        assert diff["improvements"] == [] and diff["added"] == [] and diff["removed"] == []
+
+        reverse = store.diff("v2", "v1")
+        assert len(reverse["improvements"]) == 1 and reverse["regressions"] == []
+        assert store.diff("v1", "v1")["buckets_changed"] == 0
+
+
+def test_rerecording_a_document_replaces_it(tmp_path):
+    pairs = _corpus(tmp_path, 3)
+    with RunStore(tmp_path / "runs.db") as store:
+        _record(store, "a", pairs)
+        _record(store, "b", pairs)
+        gt, ev = pairs[0]
+        _doc(ev, ["Name here", "Total 0 CELL_100", "plain"])
+        _record(store, "b", pairs[:1])
+        assert len(store.diff("a", "b")["regressions"]) == 1
+        # Restoring the document brings run b's digests back in line with run a
+        _doc(ev, ["Name CELL_0 here", "Total 0 CELL_100", "plain"])
+        _record(store, "b", pairs[:1])
+        assert store.diff("a", "b")["buckets_changed"] == 0
+
+
+def test_added_and_removed_documents(tmp_path):
+    pairs = _corpus(tmp_path, 3)
+    with RunStore(tmp_path / "runs.db") as store:
+        _record(store, "a", pairs[:2])
+        _record(store, "b", pairs[1:])
+        diff = store.diff("a", "b")
+    assert [d["eval_path"] for d in diff["added"]] == [str(pairs[2][1])]
+    assert [d["eval_path"] for d in diff["removed"]] == [str(pairs[0][1])]
+
+
+def test_record_requires_cells(tmp_path):
+    gt, ev = _corpus(tmp_path, 1)[0]
+    with RunStore(tmp_path / "runs.db") as store, pytest.raises(ValueError):
+        store.record("a", gt, ev, evaluate_documents(gt, ev))
+
+
+def test_cli_record_and_diff(tmp_path, capsys):
+    gt, ev = _corpus(tmp_path, 1)[0]
+    store = tmp_path / "runs.db"
+    out = tmp_path / "report.json"
+    common = ["--gt", str(gt), "--eval", str(ev), "--format", "json", "--out", str(out), "--run-store", str(store)]
+    main([*common, "--record-run", "v1"])
+    assert "cells" not in json.loads(out.read_text(encoding="utf-8"))
+    _doc(ev, ["Name CELL_0 here", "Total 0", "plain"])
+    main([*common, "--record-run", "v2"])
+
+    main(["diff-runs", "v1", "v2", "--run-store", str(store), "--format", "json"])
+    diff = json.loads(capsys.readouterr().out)
+    assert [d["row"] for d in diff["regressions"]] == [1]
+    assert "Regressions" in format_run_diff(diff, "md")
+    assert format_run_diff(diff, "csv").splitlines()[1].startswith("regressions,")
+
+    with pytest.raises(SystemExit):
+        main(["diff-runs", "v1", "missing", "--run-store", str(store)])
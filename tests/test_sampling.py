@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.evaluator import evaluate_documents  # noqa: E402
+from src.report import format_estimate_report  # noqa: E402
+from src.sampling import estimate_corpus  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _make_pair(tmp: Path, idx: int, rows: int, misplaced_every: int) -> tuple[Path, Path]:
+    gt = new_doc()
+    ev = new_doc()
+    t1 = add_table(gt, rows, 3)
+    t2 = add_table(ev, rows, 3)
+    for r in range(rows):
+        set_cell_text(t1.cell(r, 0), f"Row {r} header")
+        set_cell_text(t2.cell(r, 0), f"Row {r} header")
+        set_cell_text(t1.cell(r, 1), f"value CELL_{r} here")
+        if misplaced_every and r % misplaced_every == 0:
+            set_cell_text(t2.cell(r, 1), f"CELL_{r} value here")
+        else:
+            set_cell_text(t2.cell(r, 1), f"value CELL_{r} here")
+        set_cell_text(t1.cell(r, 2), "")
+        set_cell_text(t2.cell(r, 2), "")
+    p_gt, p_ev = tmp / f"d{idx}_gt.docx", tmp / f"d{idx}_ev.docx"
+    save(gt, p_gt)
+    save(ev, p_ev)
+    return p_gt, p_ev
+
+
+def test_exhaustive_sampling_matches_exact_totals(tmp_path: Path):
+    pairs = [_make_pair(tmp_path, i, rows=6, misplaced_every=i + 2) for i in range(3)]
+    exact = {"gt_total": 0, "eval_total": 0, "correct": 0}
+    for gt_p, ev_p in pairs:
+        res = evaluate_documents(gt_p, ev_p)
+        for k in exact:
+            exact[k] += res[k]
+
+    est = estimate_corpus(pairs, cell_fraction=1.0, min_documents=1, precision=0.0)
+    assert est["documents_sampled"] == 3
+    assert est["gt_total"] == exact["gt_total"]
+    assert est["eval_total"] == exact["eval_total"]
+    assert est["correct_estimate"] == exact["correct"]
+    assert est["rates"]["correct"]["estimate"] == exact["correct"] / exact["gt_total"]
+    assert est["rates"]["correct"]["half_width"] == 0.0
+
+
+def test_sampling_is_reproducible_from_seed(tmp_path: Path):
+    pairs = [_make_pair(tmp_path, i, rows=20, misplaced_every=3) for i in range(4)]
+    a = estimate_corpus(pairs, cell_fraction=0.3, seed=7, min_documents=2)
+    b = estimate_corpus(pairs, cell_fraction=0.3, seed=7, min_documents=2)
+    assert a == b
+    assert a["cells_evaluated"] < a["cells_total"]
+    rate = a["rates"]["correct"]
+    assert rate["low"] <= rate["estimate"] <= rate["high"]
+
+
+def test_early_stop_once_precision_reached(tmp_path: Path):
+    # Identical documents: between-document variance is zero, so the CI collapses
+    pair = _make_pair(tmp_path, 0, rows=4, misplaced_every=0)
+    pairs = [pair] * 10
+    est = estimate_corpus(pairs, min_documents=3, precision=0.01)
+    assert est["stopped_early"]
+    assert est["documents_sampled"] == 3
+    assert est["rates"]["correct"]["estimate"] == 1.0
+    assert est["rates"]["misplaced"]["estimate"] == 0.0
+
+
+def test_single_document_sample_has_no_interval(tmp_path: Path):
+    pairs = [_make_pair(tmp_path, 0, rows=6, misplaced_every=2)]
+    result = estimate_corpus(pairs, cell_fraction=0.5, min_documents=1)
+    correct = result["rates"]["correct"]
+    assert correct["estimate"] is not None
+    assert correct["half_width"] is None and correct["low"] is None and correct["high"] is None
+    assert not result["precision_reached"]
+    # Strict JSON: no bare Infinity/NaN tokens
+    json.loads(format_estimate_report(result, "json"), parse_constant=lambda c: pytest.fail(f"invalid JSON {c}"))
+    assert "inf" not in format_estimate_report(result, "md")
+
+
+def test_document_time_budget_spans_all_strata(tmp_path: Path, monkeypatch):
+    import src.sampling as sampling
+    from src.evaluator import EvaluationBudget
+
+    calls = []
+    real = sampling._document_deadline
+    monkeypatch.setattr(sampling, "_document_deadline", lambda budget: calls.append(1) or real(budget))
+    pairs = [_make_pair(tmp_path, i, rows=12, misplaced_every=i + 2) for i in range(3)]
+    budget = EvaluationBudget(max_document_seconds=60.0)
+    estimate_corpus(pairs, cell_fraction=1.0, min_documents=3, budget=budget)
+    assert len(calls) == 3
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cli import main as cli_main  # noqa: E402
+from src.docx_utils import extract_table_cell_texts, iter_table_cell_texts  # noqa: E402
+from src.evaluator import evaluate_documents, evaluate_documents_streaming  # noqa: E402
+from src.memory import MemoryTracker, current_rss_bytes, max_rss_bytes  # noqa: E402
+from tests.helpers import add_table, merge, new_doc, save, set_cell_text  # noqa: E402
+
+# Traced-allocation ceiling for any single streaming stage
+MEMORY_CEILING_BYTES = 2 * 1024 * 1024
+
+
+def _large_doc(path: Path, tables: int, shift: bool = False) -> Path:
+    doc = new_doc()
+    for t in range(tables):
+        doc.add_paragraph(f"Section {t}")
+        table = add_table(doc, 6, 4)
+        for r in range(6):
+            for c in range(4):
+                n = r * 4 + c
+                token = f"CELL_{n}"
+                text = f"table {t} row {r} {token} col {c} filler text"
+                if shift and n % 5 == 0:
+                    text = f"table {t} row {r} col {c} {token} filler text"
+                set_cell_text(table.cell(r, c), text)
+        if t % 10 == 0:
+            merge(table, 0, 0, 1, 1)
+    save(doc, path)
+    return path
+
+
+def test_streamed_tables_match_full_extraction(tmp_path: Path):
+    path = _large_doc(tmp_path / "doc.docx", tables=12)
+    streamed = [cell for table in iter_table_cell_texts(path) for cell in table]
+    assert streamed == extract_table_cell_texts(path)
+
+    ev = _large_doc(tmp_path / "ev.docx", tables=12, shift=True)
+    assert evaluate_documents_streaming(path, ev, debug=True)["cells"] == evaluate_documents(path, ev, debug=True)["cells"]
+
+
+def test_streaming_totals_match_and_memory_stays_bounded(tmp_path: Path):
+    small_gt = _large_doc(tmp_path / "small_gt.docx", tables=20)
+    small_ev = _large_doc(tmp_path / "small_ev.docx", tables=20, shift=True)
+    big_gt = _large_doc(tmp_path / "big_gt.docx", tables=80)
+    big_ev = _large_doc(tmp_path / "big_ev.docx", tables=80, shift=True)
+
+    small = evaluate_documents_streaming(small_gt, small_ev)
+    big = evaluate_documents_streaming(big_gt, big_ev)
+
+    exact = evaluate_documents(big_gt, big_ev)
+    for k in ("gt_total", "eval_total", "correct", "missed", "misplaced"):
+        assert big[k] == exact[k]
+
+    assert set(big["memory"]["stages"]) == {"extract_gt", "extract_eval", "evaluate"}
+    assert big["memory"]["stages"]["evaluate"]["calls"] == 80
+    for stage, stats in big["memory"]["stages"].items():
+        # Bounded by the largest table, not by the document: 4x the tables, ~same peak
+        assert stats["traced_peak_bytes"] < MEMORY_CEILING_BYTES, stage
+        assert stats["traced_peak_bytes"] < 1.5 * small["memory"]["stages"][stage]["traced_peak_bytes"], stage
+
+
+def test_cli_max_memory_reports_memory(tmp_path: Path):
+    gt = _large_doc(tmp_path / "gt.docx", tables=3)
+    ev = _large_doc(tmp_path / "ev.docx", tables=3, shift=True)
+    out = tmp_path / "report.json"
+    cli_main(["--gt", str(gt), "--eval", str(ev), "--format", "json", "--out", str(out), "--max-memory", "4G"])
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["memory"]["within_limit"]
+    assert report["memory"]["limit_bytes"] == 4 * 1024**3
+    assert report["gt_total"] == 72
+
+    with pytest.raises(SystemExit):
+        cli_main(["--gt", str(gt), "--eval", str(ev), "--format", "json", "--out", str(out),
+                  "--max-memory", "4G", "--executor", "threads"])  # fmt: skip
+
+
+def test_streaming_does_not_expand_entities(tmp_path: Path):
+    import zipfile
+
+    src = tmp_path / "plain.docx"
+    doc = new_doc()
+    set_cell_text(add_table(doc, 1, 1).cell(0, 0), "before ENTITY_HERE after")
+    save(doc, src)
+    crafted = tmp_path / "crafted.docx"
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(crafted, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "word/document.xml":
+                head, body = data.split(b"?>", 1)
+                doctype = b'<!DOCTYPE w:document [<!ENTITY x "CELL_9">]>'
+                data = head + b"?>" + doctype + body.replace(b"ENTITY_HERE", b"&x;")
+            zout.writestr(item, data)
+
+    streamed = [c.text for table in iter_table_cell_texts(crafted) for c in table]
+    assert not any("CELL_9" in t for t in streamed)
+    assert streamed == [c.text for c in extract_table_cell_texts(crafted)]
+
+
+@pytest.mark.skipif(current_rss_bytes() is None or max_rss_bytes() is None, reason="needs /proc and getrusage")
+def test_memory_limit_sees_spikes_inside_a_stage():
+    # A spike freed before the stage ends is invisible to the boundary samples
+    limit = max_rss_bytes() + 32 * 1024 * 1024
+    with MemoryTracker(limit_bytes=limit) as tracker:
+        with tracker.stage("evaluate"):
+            spike = b"x" * (limit - current_rss_bytes() + 32 * 1024 * 1024)
+            del spike
+    summary = tracker.summary()
+    assert summary["peak_rss_bytes"] <= limit
+    assert not summary["within_limit"]
@@ -7,6 +7,7 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from src.docx_utils import extract_table_cell_texts  # noqa: E402
 from src.evaluator import evaluate_documents  # noqa: E402
 from src.report import format_report  # noqa: E402
 from tests.helpers import (  # noqa: E402
@@ -170,3 +171,14 @@ def test_merged_cells_wrong_position_across_parts(tmp_path: Path):
     assert res["misplaced"] == 1
 
 
+def test_unmerged_cells_never_grouped(tmp_path: Path):
+    # Cell proxies freed between rows could reuse an id and merge unrelated cells
+    doc = new_doc()
+    table = add_table(doc, 30, 8)
+    merge(table, 0, 0, 1, 1)
+    save(doc, tmp_path / "grid.docx")
+    for _ in range(3):
+        cells = extract_table_cell_texts(tmp_path / "grid.docx")
+        assert len(cells) == 30 * 8 - 3
+        assert cells[0].merged_rect == (0, 0, 1, 1)
+        assert all(c.merged_rect == (c.row_index, c.col_index) * 2 for c in cells[1:])
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cli import main  # noqa: E402
+from src.docx_utils import CellText, TokenGrammar, find_tokens, strip_tokens_by_family  # noqa: E402
+from src.evaluator import evaluate_cell_texts  # noqa: E402
+from src.report import format_report  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+GRAMMAR = TokenGrammar(
+    {
+        "field": r"\{\{\w+\}\}",
+        "ref": r"\[\[ref:\d+\]\]",
+        "cell": r"(?i)cell_\d+",
+    }
+)
+
+
+def _row(texts: list[str]) -> list[CellText]:
+    return [CellText(0, 0, c, (0, c, 0, c), t) for c, t in enumerate(texts)]
+
+
+def test_single_scan_reports_every_family():
+    base, tokens = strip_tokens_by_family("a {{name}} b [[ref:3]] c cell_7", GRAMMAR)
+    assert base == "a  b  c "
+    assert tokens == [(2, "field", "{{name}}"), (5, "ref", "[[ref:3]]"), (8, "cell", "CELL_7")]
+
+
+def test_inline_flags_stay_scoped_to_their_family():
+    grammar = TokenGrammar({"cell": r"(?i)cell_\d+", "tag": r"TAG\d"})
+    assert find_tokens("CeLl_1 tag1 TAG2", grammar) == [(0, 6), (12, 16)]
+
+
+def test_default_grammar_unchanged():
+    assert find_tokens("x CELL_1 y cell_22") == [(2, 8), (11, 18)]
+
+
+@pytest.mark.parametrize(
+    "specs",
+    [["novalue"], ["a="], ["a=(unclosed"], ["a=x*"], ["a=x", "a=y"]],
+)
+def test_invalid_specs_raise(specs):
+    with pytest.raises(ValueError):
+        TokenGrammar.from_specs(specs)
+
+
+def test_per_family_totals():
+    gt = _row(["a {{name}} b [[ref:1]]", "CELL_1 tail"])
+    # The ref is replaced by a field at the same spot, so neither family counts it
+    ev = _row(["a {{name}} b {{date}}", "tail CELL_1"])
+    res = evaluate_cell_texts(gt, ev, grammar=GRAMMAR)
+    assert (res["gt_total"], res["eval_total"], res["correct"]) == (3, 3, 1)
+    assert res["families"]["field"] == {"gt_total": 1, "eval_total": 2, "correct": 1, "misplaced": 1, "missed": 0}
+    assert res["families"]["ref"] == {"gt_total": 1, "eval_total": 0, "correct": 0, "misplaced": 0, "missed": 1}
+    assert res["families"]["cell"]["missed"] == 1
+
+
+def test_identity_mode_joins_on_family_and_id():
+    gt = _row(["{{a}}", "[[ref:1]]"])
+    ev = _row(["[[ref:1]]", "{{a}}"])
+    res = evaluate_cell_texts(gt, ev, match="identity", grammar=GRAMMAR)
+    # Each slot holds a token of another family: swapped, never correct
+    assert (res["correct"], res["swapped"], res["misplaced"]) == (0, 2, 0)
+    assert res["families"]["field"]["swapped"] == 1
+
+
+def test_single_family_grammar_matches_default():
+    gt = _row(["a CELL_1 b CELL_2", "CELL_3"])
+    ev = _row(["a b CELL_1 CELL_2", "x CELL_3"])
+    custom = evaluate_cell_texts(gt, ev, grammar=TokenGrammar({"cell": r"(?i)cell_\d+"}))
+    assert custom == evaluate_cell_texts(gt, ev)
+    assert "families" not in custom
+
+
+def test_cli_token_patterns(tmp_path):
+    gt = new_doc()
+    ev = new_doc()
+    set_cell_text(add_table(gt, 1, 1).cell(0, 0), "Dear {{name}}, see [[ref:2]]")
+    set_cell_text(add_table(ev, 1, 1).cell(0, 0), "Dear {{name}}, see")
+    save(gt, tmp_path / "gt.docx")
+    save(ev, tmp_path / "ev.docx")
+    out = tmp_path / "report.json"
+    main(
+        [
+            "--gt", str(tmp_path / "gt.docx"),
+            "--eval", str(tmp_path / "ev.docx"),
+            "--format", "json",
+            "--out", str(out),
+            "--token-pattern", r"field=\{\{\w+\}\}",
+            "--token-pattern", r"ref=\[\[ref:\d+\]\]",
+        ]
+    )  # fmt: skip
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["families"]["field"]["correct"] == 1
+    assert report["families"]["ref"]["missed"] == 1
+    assert "field_correct" in format_report(report, "csv")
+    assert "| family |" in format_report(report, "md")
+
+    with pytest.raises(SystemExit):
+        main(["--gt", str(tmp_path / "gt.docx"), "--eval", str(tmp_path / "ev.docx"), "--format", "json",
+              "--out", str(out), "--token-pattern", "broken"])  # fmt: skip
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pairing import match_gt_stem, pair_directories  # noqa: E402
+from src.watch import EvalDirectoryWatcher  # noqa: E402
+from tests.helpers import add_table, new_doc, save, set_cell_text  # noqa: E402
+
+
+def _write_doc(path: Path, texts: list[str]) -> None:
+    doc = new_doc()
+    table = add_table(doc, 1, len(texts))
+    for c, text in enumerate(texts):
+        set_cell_text(table.cell(0, c), text)
+    save(doc, path)
+
+
+def test_match_gt_stem():
+    stems = {"report", "report_long", "invoice"}
+    assert match_gt_stem("report", stems) == "report"
+    assert match_gt_stem("report__model-a", stems) == "report"
+    assert match_gt_stem("report_long.v2", stems) == "report_long"
+    assert match_gt_stem("reporter", stems) is None
+    assert match_gt_stem("other", stems) is None
+
+
+def test_pair_directories_skips_lock_files(tmp_path: Path):
+    gt_dir, ev_dir = tmp_path / "gt", tmp_path / "ev"
+    _write_doc(gt_dir / "a.docx", ["CELL_1"])
+    _write_doc(ev_dir / "a_run1.docx", ["CELL_1"])
+    _write_doc(ev_dir / "~$a_run1.docx", ["CELL_1"])
+    _write_doc(ev_dir / "zzz.docx", ["CELL_1"])
+    assert pair_directories(gt_dir, ev_dir) == [(gt_dir / "a.docx", ev_dir / "a_run1.docx")]
+
+
+def test_scan_debounces_until_settled(tmp_path: Path):
+    gt_dir, ev_dir = tmp_path / "gt", tmp_path / "ev"
+    _write_doc(gt_dir / "a.docx", ["CELL_1"])
+    _write_doc(ev_dir / "a.docx", ["CELL_1"])
+    watcher = EvalDirectoryWatcher(gt_dir, ev_dir, tmp_path / "out", settle_seconds=5.0)
+
+    assert watcher.scan(now=100.0) == []
+    assert watcher.scan(now=103.0) == []
+    # File grows while being written: debounce window restarts
+    with open(ev_dir / "a.docx", "ab") as f:
+        f.write(b"\0")
+    assert watcher.scan(now=106.0) == []
+    assert watcher.scan(now=110.0) == []
+    ready = watcher.scan(now=111.0)
+    assert [p for p, _ in ready] == [ev_dir / "a.docx"]
+
+
+def test_run_scores_new_and_changed_files(tmp_path: Path):
+    gt_dir, ev_dir, out_dir = tmp_path / "gt", tmp_path / "ev", tmp_path / "out"
+    _write_doc(gt_dir / "a.docx", ["CELL_1", "CELL_2"])
+    _write_doc(gt_dir / "b.docx", ["x CELL_3"])
+    _write_doc(ev_dir / "a_m1.docx", ["CELL_1", ""])
+    _write_doc(ev_dir / "b_m1.docx", ["x CELL_3"])
+
+    watcher = EvalDirectoryWatcher(gt_dir, ev_dir, out_dir, workers=2, settle_seconds=0, use_inotify=False)
+    agg = watcher.run(max_cycles=1)
+    assert agg["documents"] == 2
+    assert agg["gt_total"] == 3
+    assert agg["correct"] == 2
+    assert agg["missed"] == 1
+
+    on_disk = json.loads((out_dir / "aggregate.json").read_text(encoding="utf-8"))
+    assert on_disk["correct"] == 2
+    assert json.loads((out_dir / "documents" / "a_m1.json").read_text(encoding="utf-8"))["missed"] == 1
+
+    # Unchanged files are not rescored; GT cells stay cached
+    assert [p for p, _ in watcher.scan()] == []
+    assert set(watcher._gt_cache) == {gt_dir / "a.docx", gt_dir / "b.docx"}
+
+    _write_doc(ev_dir / "a_m1.docx", ["CELL_1", "CELL_2"])
+    os.utime(ev_dir / "a_m1.docx", ns=(1, 1))
+    agg = watcher.run(max_cycles=1)
+    assert agg["correct"] == 3
+    assert agg["missed"] == 0
+
+    assert json.loads((out_dir / "aggregate.json").read_text(encoding="utf-8"))["documents"] == 2
+
+
+def test_results_dropped_when_gt_removed(tmp_path: Path):
+    gt_dir, ev_dir, out_dir = tmp_path / "gt", tmp_path / "ev", tmp_path / "out"
+    _write_doc(gt_dir / "a.docx", ["CELL_1"])
+    _write_doc(gt_dir / "b.docx", ["CELL_2"])
+    _write_doc(ev_dir / "a_m1.docx", ["CELL_1"])
+    _write_doc(ev_dir / "b_m1.docx", ["CELL_2"])
+    watcher = EvalDirectoryWatcher(gt_dir, ev_dir, out_dir, settle_seconds=0, use_inotify=False, executor="threads")
+    assert watcher.run(max_cycles=1)["documents"] == 2
+
+    (gt_dir / "b.docx").unlink()
+    agg = watcher.run(max_cycles=1)
+    assert (agg["documents"], agg["gt_total"]) == (1, 1)
+    assert json.loads((out_dir / "aggregate.json").read_text(encoding="utf-8"))["documents"] == 1
+
+
+def test_document_reports_never_replace_the_aggregate(tmp_path: Path):
+    gt_dir, ev_dir, out_dir = tmp_path / "gt", tmp_path / "ev", tmp_path / "out"
+    _write_doc(gt_dir / "aggregate.docx", ["CELL_1"])
+    _write_doc(ev_dir / "aggregate.docx", ["CELL_1"])
+    _write_doc(ev_dir / "aggregate_x.docx", [""])
+    watcher = EvalDirectoryWatcher(gt_dir, ev_dir, out_dir, settle_seconds=0, use_inotify=False, executor="threads")
+    watcher.run(max_cycles=1)
+    assert json.loads((out_dir / "aggregate.json").read_text(encoding="utf-8"))["documents"] == 2
+    assert json.loads((out_dir / "documents" / "aggregate_x.json").read_text(encoding="utf-8"))["missed"] == 1
+
+    # Reports of eval files that are gone are removed with their results
+    (ev_dir / "aggregate_x.docx").unlink()
+    watcher.run(max_cycles=1)
+    assert sorted(p.name for p in (out_dir / "documents").iterdir()) == ["aggregate.json"]
+
+
+def test_failed_job_retried_when_gt_changes(tmp_path: Path):
+    gt_dir, ev_dir, out_dir = tmp_path / "gt", tmp_path / "ev", tmp_path / "out"
+    _write_doc(gt_dir / "a.docx", ["CELL_1"])
+    ev_dir.mkdir()
+    (ev_dir / "a_m1.docx").write_bytes(b"not a zip")
+    watcher = EvalDirectoryWatcher(gt_dir, ev_dir, out_dir, settle_seconds=0, use_inotify=False, executor="threads")
+    assert watcher.run(max_cycles=1)["documents"] == 0
+    # Neither file changed: no retry
+    assert watcher.scan() == []
+
+    _write_doc(gt_dir / "a.docx", ["x CELL_1"])
+    os.utime(gt_dir / "a.docx", ns=(1, 1))
+    assert [p for p, _ in watcher.scan()] == [ev_dir / "a_m1.docx"]